@@ -1,11 +1,37 @@
-from streamlit_extras.stylable_container import stylable_container
 import sys
+import os
+import queue
+import threading
+import time
+import base64
+import hashlib
+import struct
+import uuid
+from collections import OrderedDict
+from functools import lru_cache
 import streamlit as st
-import pandas as pd
+import numpy as np
 import json
 import subprocess
 from pathlib import Path
 
+try:
+    import resource
+except ImportError:
+    # Windows: the memory panel shows no peak RSS
+    resource = None
+
+# Waveform peaks and word boundaries come from the generator's modules
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from disk_janitor import Janitor
+from render_cache import file_sha256
+from render_scheduler import FULL, PREVIEW, SMALL, PRIORITY_NAMES, RenderScheduler, SchedulerBusy
+from render_trace import sidecar_path
+from session_stats import SessionStats
+from trial_store import TrialStore
+from waveform_peaks import get_peaks, peak_window
+from word_segments import segment_map_from_energy, word_weights
+
 st.set_page_config(page_title="Demo", layout="centered")
 
 # Page width and padding
@@ -20,52 +46,208 @@ section.main > div {
 </style>
 """, unsafe_allow_html=True)
 
-def load_trials(path="data/trials.csv"):
+def file_signature(path):
+    # (mtime_ns, size), or None if the file is missing
     try:
-        df = pd.read_csv(path)
-        return df.to_dict(orient="records")
-    except FileNotFoundError:
-        print(f"Warning: {path} not found. No built-in trials will be loaded.")
-        return []
-    except pd.errors.EmptyDataError:
-        print(f"Warning: {path} is empty. No built-in trials will be loaded.")
-        return []
-
-def is_valid_trial(trial):
-    baseline_ok = Path(trial["baseline"]).exists()
-
-    transcript_value = trial.get("transcript", "")
-    transcript_ok = pd.notna(transcript_value) and bool(str(transcript_value).strip())
-
-    return baseline_ok and transcript_ok
-
-# Filter invalid built-in trials once and keep count
-_loaded_trials = load_trials()
-built_in_examples = []
-invalid_trial_count = 0
-
-for t in _loaded_trials:
-    if is_valid_trial(t):
-        built_in_examples.append(t)
-    else:
-        invalid_trial_count += 1
+        st_ = os.stat(path)
+    except OSError:
+        return None
+    return (st_.st_mtime_ns, st_.st_size)
+
+# Trials, user-added trials and per-word edits live in a SQLite store
+# (scripts/trial_store.py); trials.csv is imported into it when it changes
+TRIAL_CSV = "data/trials.csv"
+TRIAL_DB = os.environ.get("DEMO_TRIAL_DB", "data/trials.sqlite")
+# How often reruns may touch the filesystem to look for catalog changes
+CATALOG_CHECK_INTERVAL_S = 2.0
+# Trials and edits of sessions idle this long are dropped from the store
+SESSION_TTL_S = float(os.environ.get("DEMO_SESSION_TTL_S", str(7 * 24 * 3600)))
+SESSION_PRUNE_INTERVAL_S = 3600.0
+# Trials fetched on each side of the one shown
+PREFETCH_TRIALS = 2
+SEARCH_RESULTS = 20
+
+class TrialCatalog:
+    # Process-wide handle on the trial store. trials.csv is re-imported only
+    # when its mtime/size differ from the last import, which validates the
+    # baselines once; between checks a rerun does no filesystem work at all.
+
+    def __init__(self, csv_path, db_path):
+        self.csv_path = csv_path
+        self.store = TrialStore(db_path)
+        self.lock = threading.Lock()
+        self.checked_at = None
+        self.pruned_at = None
+
+    def refresh(self):
+        now = time.monotonic()
+        if self.checked_at is not None and now - self.checked_at < CATALOG_CHECK_INTERVAL_S:
+            return
+
+        with self.lock:
+            self.checked_at = now
+            sig = file_signature(self.csv_path)
+            if self.store.meta("csv_signature") != (list(sig) if sig else None):
+                self.store.import_csv(self.csv_path, list(sig) if sig else None)
+            if self.pruned_at is None or now - self.pruned_at >= SESSION_PRUNE_INTERVAL_S:
+                self.store.prune_sessions(SESSION_TTL_S)
+                self.pruned_at = now
+
+    def skipped_count(self):
+        return self.store.meta("skipped_count", 0)
+
+@st.cache_resource
+def get_trial_catalog(csv_path=TRIAL_CSV, db_path=TRIAL_DB):
+    return TrialCatalog(csv_path, db_path)
+
+class TrialList:
+    # The trials one session sees, built-in ones first, by position. Rows come
+    # from the store PREFETCH_TRIALS on each side of the one asked for and are
+    # kept in `cache` (session state) until the catalog is re-imported.
+
+    def __init__(self, store, session_id, cache):
+        self.store = store
+        self.session_id = session_id
+        self.cache = cache
+        self.length = store.count(session_id)
+        version = store.meta("version")
+        if cache.get("version") != version:
+            cache["version"] = version
+            cache["rows"] = {}
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.length:
+            raise IndexError(i)
+        rows = self.cache["rows"]
+        if i not in rows:
+            rows.clear()
+            rows.update(self.store.window(self.session_id, i, PREFETCH_TRIALS))
+        return rows[i]
+
+catalog = get_trial_catalog()
+catalog.refresh()
+invalid_trial_count = catalog.skipped_count()
 
 # Parameters controlled by sliders
 PARAMS = ["breathiness", "creakiness", "nasality", "average_pitch", "average_range"]
 
-def default_param():
-    return {p: 0.0 for p in PARAMS}
-
-def word_is_modified(ex_i, word_i):
-    # Returns True if the word has parameters different from the default.
-    wp = st.session_state.trial_state[ex_i]["word_params"][word_i]
-    for p in PARAMS:
-        if wp[p] != 0.0:
-            return True
-    return False
-
-def slider_key(ex_i, word_i, param):
-    return f"ex{ex_i}_{word_i}_{param}"
+# Slider steps are 0.1, so rounding float32 values back to this many
+# decimals gives exactly the floats the sliders produced
+PARAM_DECIMALS = 6
+
+class WordParams:
+    # Per-trial editing state: one float32 row of PARAMS per word, plus the
+    # selection. selected_at[i] is 0 for unselected words, otherwise the order
+    # in which the word was selected, so "first selected" keeps its meaning.
+    compacted = False
+
+    def __init__(self, n_words, trial_id=None):
+        self.trial_id = trial_id
+        self.values = np.zeros((max(n_words, 1), len(PARAMS)), dtype=np.float32)
+        self.selected_at = np.zeros(len(self.values), dtype=np.int32)
+        self.next_stamp = 1
+        self.anchor = 0
+        self.select(0)
+
+    def __len__(self):
+        return len(self.values)
+
+    def selected_mask(self):
+        return self.selected_at > 0
+
+    def selected(self):
+        # Selected word indices in selection order
+        idx = np.flatnonzero(self.selected_at)
+        return idx[np.argsort(self.selected_at[idx], kind="stable")].tolist()
+
+    def n_selected(self):
+        return int(np.count_nonzero(self.selected_at))
+
+    def is_selected(self, word_i):
+        return bool(self.selected_at[word_i])
+
+    def select(self, word_i):
+        # Newly selected words start from default params
+        self.selected_at[word_i] = self.next_stamp
+        self.next_stamp += 1
+        self.values[word_i] = 0.0
+
+    def deselect(self, word_i):
+        self.selected_at[word_i] = 0
+        if word_i == self.anchor:
+            self.anchor = self.selected()[0]
+
+    def apply(self, vals):
+        # Same params for every selected word
+        self.values[self.selected_mask()] = vals
+
+    def reset_selected(self):
+        self.values[self.selected_mask()] = 0.0
+
+    def modified_mask(self):
+        # True for words with parameters different from the default
+        return (self.values != 0.0).any(axis=1)
+
+    def has_edits(self):
+        return bool(self.modified_mask().any())
+
+    def rows(self, start=0, stop=None):
+        # Plain float rows, rounded back to the slider values
+        return np.round(self.values[start:stop].astype(np.float64), PARAM_DECIMALS).tolist()
+
+    def word(self, word_i):
+        return dict(zip(PARAMS, self.rows(word_i, word_i + 1)[0]))
+
+    def load_edits(self, word_edits):
+        # Inverse of edits(): fills in stored per-word values
+        for i, row in word_edits.items():
+            if int(i) < len(self.values):
+                self.values[int(i)] = row
+
+    def edits(self, n_words):
+        # {"<index>": [values in PARAMS order]} for words that differ from
+        # the default; the request's word_edits format
+        idx = np.flatnonzero(self.modified_mask()[:n_words])
+        rows = np.round(self.values[idx].astype(np.float64), PARAM_DECIMALS).tolist()
+        # 0 and 1 rather than 0.0 and 1.0 keep the file short
+        return {str(i): [int(v) if v.is_integer() else v for v in row] for i, row in zip(idx.tolist(), rows)}
+
+    def compact(self):
+        return CompactTrial(self.trial_id, self.anchor, tuple(self.selected()), self.has_edits())
+
+    def restore(self, compact):
+        # Selection and anchor of a compacted trial, in their selection order
+        self.selected_at[:] = 0
+        for stamp, word_i in enumerate(compact.selected, start=1):
+            if word_i < len(self.selected_at):
+                self.selected_at[word_i] = stamp
+        self.next_stamp = len(compact.selected) + 1
+        self.anchor = compact.anchor
+
+class CompactTrial:
+    # What a trial the session is not on keeps: its selection and anchor.
+    # The values are in the trial store, which every edit writes through
+    # (save_trial_edits), and are loaded back when the trial is shown again.
+    # Told apart from WordParams by `compacted`: the page's classes are
+    # redefined on every rerun, so isinstance() fails on older objects.
+    __slots__ = ("trial_id", "anchor", "selected", "edited")
+    compacted = True
+
+    def __init__(self, trial_id, anchor, selected, edited):
+        self.trial_id = trial_id
+        self.anchor = anchor
+        self.selected = selected
+        self.edited = edited
+
+    def has_edits(self):
+        return self.edited
+
+def slider_key(param):
+    # One slider per param, showing the current trial's anchor word
+    return f"slider_{param}"
 
 
 # Session state initialization
@@ -74,47 +256,201 @@ if "example_index" not in st.session_state:
 
 if "trial_state" not in st.session_state:
     st.session_state.trial_state = {}
-    # {example_index: {"selected_words": [int,...], "anchor_word": int, "word_params": {word_index: {param: value}}}}
+    # {example_index: WordParams for the current trial, CompactTrial for the others}
 
 if "status_message" not in st.session_state:
     st.session_state.status_message = "No changes applied"
 
 if "generated_audio" not in st.session_state:
     st.session_state.generated_audio = {}
-    # {ex_i: "generated/ex1_generated.wav"}
-
-# User-uploaded trials live only for the current session
-if "user_trials" not in st.session_state:
-    st.session_state.user_trials = []
+    # {ex_i: "generated/sessions/<session>/ex1_generated.wav"}
+
+if "render_cache_stats" not in st.session_state:
+    st.session_state.render_cache_stats = {"hit": 0, "miss": 0}
+
+# Latest background render per trial
+if "render_jobs" not in st.session_state:
+    st.session_state.render_jobs = {}
+    # {ex_i: RenderJob}
+
+# Per-stage timings of the last published render per trial
+if "render_breakdowns" not in st.session_state:
+    st.session_state.render_breakdowns = {}
+    # {ex_i: {"cache": ..., "total_ms": ..., "stages": [{"name", "ms", "bytes"}]}}
+
+# Request hash of each trial's published render, to skip up-to-date trials
+if "rendered_hashes" not in st.session_state:
+    st.session_state.rendered_hashes = {}
+
+# Auto-render: trials waiting for their sliders to settle
+if "auto_render_due" not in st.session_state:
+    st.session_state.auto_render_due = {}
+    # {ex_i: time.monotonic() at which to queue the render}
+
+# Renders replaced by newer params before they were published
+if "superseded_jobs" not in st.session_state:
+    st.session_state.superseded_jobs = []
+    # [RenderJob] still running; counted into stale_renders once finished
+if "stale_renders" not in st.session_state:
+    st.session_state.stale_renders = {"cancelled": 0, "discarded": 0, "cpu_s": 0.0}
+
+# The last "Render all" batch
+if "render_all" not in st.session_state:
+    st.session_state.render_all = None
+    # {"trials": [ex_i, ...], "up_to_date": int, "started": time}
+
+# Rows of the trial store around the current trial (see TrialList)
+if "trial_window" not in st.session_state:
+    st.session_state.trial_window = {}
 
 # Used to reset uploader widgets cleanly after saving a trial
 if "upload_nonce" not in st.session_state:
     st.session_state.upload_nonce = 0
 
+# Last preview of the current trial (see compact_session_state)
+if "preview_audio" not in st.session_state:
+    st.session_state.preview_audio = {}
+    # {ex_i: {"wav": bytes, "ms": float, "cached": bool, "words": int}}
+
+# Requests, renders and previews of this session go to its own folders
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex[:12]
+
 # Local folders used by the app
 Path("uploads").mkdir(exist_ok=True)
 Path("requests").mkdir(exist_ok=True)
 Path("generated").mkdir(exist_ok=True)
 
-# Combine built-in + user uploaded trials
-examples = built_in_examples + st.session_state.user_trials
+def session_path(root, name):
+    # requests/<session>/..., generated/sessions/<session>/...
+    folder = Path(root) / st.session_state.session_id
+    folder.mkdir(parents=True, exist_ok=True)
+    return str(folder / name)
+
+def write_json_atomic(path, obj):
+    # Readers see the old file or the new one, never a partial write
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+# Disk budget for generated/, requests/ and uploads/, enforced by a
+# background janitor (scripts/disk_janitor.py) shared by all sessions.
+# Uploads that stored trials point at are only removed once the trial
+# store prunes their session (SESSION_TTL_S).
+DISK_BUDGET_MB = float(os.environ.get("DEMO_DISK_BUDGET_MB", "1024"))
+JANITOR_INTERVAL_S = float(os.environ.get("DEMO_JANITOR_INTERVAL_S", "60"))
+JANITOR_MIN_AGE_S = float(os.environ.get("DEMO_JANITOR_MIN_AGE_S", "900"))
+
+@st.cache_resource
+def get_janitor():
+    janitor = Janitor(["generated", "requests", "uploads"], int(DISK_BUDGET_MB * 1024 * 1024), JANITOR_MIN_AGE_S,
+                      pinned=get_trial_catalog().store.referenced_files)
+    janitor.start(JANITOR_INTERVAL_S)
+    return janitor
+
+# Every session reports its state size (scripts/session_stats.py) on each
+# full run; sessions silent this long are left out of the memory panel
+SESSION_STATS_MAX_AGE_S = float(os.environ.get("DEMO_SESSION_STATS_MAX_AGE_S", "1800"))
+
+@st.cache_resource
+def get_session_stats():
+    return SessionStats(SESSION_STATS_MAX_AGE_S)
+
+# Built-in trials followed by this session's uploads
+examples = TrialList(catalog.store, st.session_state.session_id, st.session_state.trial_window)
+
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+def read_wav_header(f):
+    # Parses only the RIFF header of a WAV file object and rewinds it.
+    # Returns {"format", "channels", "framerate", "bits", "data_bytes"};
+    # raises ValueError if this is not a WAV file.
+    start = f.tell()
+    try:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+            raise ValueError("not a RIFF/WAVE file")
+        info = None
+        while True:
+            head = f.read(8)
+            if len(head) < 8:
+                raise ValueError("no data chunk")
+            chunk_id, size = head[:4], struct.unpack("<I", head[4:])[0]
+            if chunk_id == b"data":
+                if info is None:
+                    raise ValueError("data chunk before fmt chunk")
+                info["data_bytes"] = size
+                return info
+            if chunk_id == b"fmt ":
+                body = f.read(size)
+                if len(body) < 16:
+                    raise ValueError("truncated fmt chunk")
+                fmt, channels, framerate, _, _, bits = struct.unpack("<HHIIHH", body[:16])
+                info = {"format": fmt, "channels": channels, "framerate": framerate, "bits": bits}
+                f.seek(size & 1, 1)
+            else:
+                # Chunks are word-aligned
+                f.seek(size + (size & 1), 1)
+    finally:
+        f.seek(start)
+
+def check_baseline_header(info):
+    # What scripts/generate_audio.py can render
+    if info["format"] != 1:
+        raise ValueError(f"audio format {info['format']} is not PCM")
+    if info["bits"] != 16:
+        raise ValueError(f"{info['bits']}-bit samples; only 16-bit PCM is supported")
+    if info["channels"] not in (1, 2):
+        raise ValueError(f"{info['channels']} channels; only mono or stereo is supported")
+    if info["framerate"] <= 0:
+        raise ValueError("invalid sample rate")
+
+def store_upload(f):
+    # Streams an upload to disk in fixed-size chunks while hashing it, and
+    # keeps it as uploads/<sha256>.wav, so identical files are stored once
+    digest = hashlib.sha256()
+    tmp = Path("uploads") / f".upload-{os.getpid()}-{threading.get_ident()}.tmp"
+    f.seek(0)
+    with open(tmp, "wb") as out:
+        while True:
+            chunk = f.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            digest.update(chunk)
+            out.write(chunk)
+    path = Path("uploads") / f"{digest.hexdigest()}.wav"
+    if path.exists():
+        tmp.unlink()
+    else:
+        os.replace(tmp, path)
+    return str(path)
 
 def add_user_trial(baseline_file, original_file, transcript_text):
-    # baseline is required, transcript required
-    user_id = len(st.session_state.user_trials) + 1
+    # baseline is required, transcript required. Returns False (with a
+    # status message) if an upload is not a usable WAV.
+    try:
+        check_baseline_header(read_wav_header(baseline_file))
+    except ValueError as e:
+        st.session_state.status_message = f"Baseline is not a usable WAV: {e}."
+        return False
+    if original_file is not None:
+        try:
+            read_wav_header(original_file)
+        except ValueError as e:
+            st.session_state.status_message = f"Original is not a WAV file: {e}."
+            return False
+
+    user_id = len(examples) - catalog.store.built_in_count() + 1
     audio_id = f"user_{user_id}"
 
     # Save baseline locally so the generator can read it
-    baseline_path = f"uploads/{audio_id}_baseline.wav"
-    with open(baseline_path, "wb") as f:
-        f.write(baseline_file.getbuffer())
+    baseline_path = store_upload(baseline_file)
 
     # Original is optional
     original_path = ""
     if original_file is not None:
-        original_path = f"uploads/{audio_id}_original.wav"
-        with open(original_path, "wb") as f:
-            f.write(original_file.getbuffer())
+        original_path = store_upload(original_file)
 
     # Trial follows the same schema as trials.csv
     new_trial = {
@@ -124,16 +460,14 @@ def add_user_trial(baseline_file, original_file, transcript_text):
         "transcript": transcript_text.strip(),
     }
 
-    st.session_state.user_trials.append(new_trial)
-
     # jump to the new trial
-    all_trials = built_in_examples + st.session_state.user_trials
-    st.session_state.example_index = len(all_trials) - 1
+    st.session_state.example_index = catalog.store.add_trial(st.session_state.session_id, new_trial)
 
     # reset widgets
     st.session_state.upload_nonce += 1
 
     st.session_state.status_message = f"Added new trial ({audio_id})."
+    return True
 
 def render_add_trial_popover():
     with st.popover("➕"):
@@ -170,83 +504,122 @@ def render_add_trial_popover():
             elif not uploaded_transcript.strip():
                 st.session_state.status_message = "Please type the transcript."
             else:
-                add_user_trial(uploaded_baseline, uploaded_original, uploaded_transcript)
-                st.session_state.upload_nonce += 1
-                st.rerun()
+                if add_user_trial(uploaded_baseline, uploaded_original, uploaded_transcript):
+                    st.session_state.upload_nonce += 1
+                    st.rerun()
+
+def load_trial_state(trial, compact=None):
+    # A trial's WordParams from its stored edits, plus a compacted trial's selection
+    state = WordParams(len(trial["transcript"].split()), trial["id"])
+    state.load_edits(catalog.store.get_edits(st.session_state.session_id, trial["id"]))
+    if compact is not None:
+        state.restore(compact)
+    return state
 
 def ensure_trial_state(ex_i):
     # Creates the per-trial state the first time we visit it
-    words = examples[ex_i]["transcript"].split()
-    if ex_i not in st.session_state.trial_state:
-        st.session_state.trial_state[ex_i] = {
-            "selected_words": [0],
-            "anchor_word": 0,
-            "word_params": {i: default_param() for i in range(len(words))},
-        }
-    else:
+    trial = examples[ex_i]
+    words = trial["transcript"].split()
+    state = st.session_state.trial_state.get(ex_i)
+    # A re-imported trials.csv can move another trial to this position
+    if state is None or state.trial_id != trial["id"]:
+        state = load_trial_state(trial)
+        st.session_state.trial_state[ex_i] = state
+    elif state.compacted:
+        state = load_trial_state(trial, state)
+        st.session_state.trial_state[ex_i] = state
+    elif state.n_selected() == 0:
         # Keep at least one selected word at all times
-        if "selected_words" not in st.session_state.trial_state[ex_i] or not st.session_state.trial_state[ex_i]["selected_words"]:
-            st.session_state.trial_state[ex_i]["selected_words"] = [0]
-            st.session_state.trial_state[ex_i]["anchor_word"] = 0
-
-        # If anchor is missing or invalid, fall back to first selected
-        if "anchor_word" not in st.session_state.trial_state[ex_i]:
-            st.session_state.trial_state[ex_i]["anchor_word"] = st.session_state.trial_state[ex_i]["selected_words"][0]
+        state.select(0)
+        state.anchor = 0
+        save_trial_edits(ex_i)
 
     return words
 
+def save_trial_edits(ex_i):
+    # Mirrors a trial's per-word edits into the store, where "next unedited" looks
+    trial = examples[ex_i]
+    edits = st.session_state.trial_state[ex_i].edits(len(trial["transcript"].split()))
+    catalog.store.set_edits(st.session_state.session_id, trial["id"], edits)
+
+def compact_session_state(ex_i):
+    # Only the current trial keeps its full editing state. Other trials keep
+    # a CompactTrial, or nothing when they are as a first visit would create
+    # them; their previews and published render jobs are dropped (previews
+    # stay in the process-wide preview cache).
+    for other, state in list(st.session_state.trial_state.items()):
+        if other == ex_i:
+            continue
+        if not state.compacted:
+            state = state.compact()
+        if not state.edited and state.selected == (0,) and state.anchor == 0:
+            del st.session_state.trial_state[other]
+        else:
+            st.session_state.trial_state[other] = state
+
+    for other in [k for k in st.session_state.preview_audio if k != ex_i]:
+        del st.session_state.preview_audio[other]
+
+    batch = st.session_state.render_all
+    batch_trials = set(batch["trials"]) if batch is not None else set()
+    for other, job in list(st.session_state.render_jobs.items()):
+        if other != ex_i and other not in batch_trials and job.applied:
+            del st.session_state.render_jobs[other]
+
 def load_word_into_sliders(ex_i, word_i):
     # Push the stored word params into the visible slider widgets
-    wp = st.session_state.trial_state[ex_i]["word_params"][word_i]
+    wp = st.session_state.trial_state[ex_i].word(word_i)
     for p in PARAMS:
-        st.session_state[slider_key(ex_i, word_i, p)] = float(wp[p])
+        st.session_state[slider_key(p)] = wp[p]
+    st.session_state.slider_anchor = (ex_i, examples[ex_i]["id"], word_i)
 
 def toggle_word(ex_i, word_i):
     # Select or deselect a word in the transcript
-    selected = st.session_state.trial_state[ex_i]["selected_words"]
-    anchor = st.session_state.trial_state[ex_i]["anchor_word"]
+    state = st.session_state.trial_state[ex_i]
 
-    if word_i in selected:
-        if len(selected) > 1:
-            selected.remove(word_i)
-
-            # If user removed the anchor, pick a new anchor
+    if state.is_selected(word_i):
+        if state.n_selected() > 1:
+            # If user removed the anchor, deselect picks the first selected as the new anchor
+            anchor = state.anchor
+            state.deselect(word_i)
             if word_i == anchor:
-                st.session_state.trial_state[ex_i]["anchor_word"] = selected[0]
+                # the sliders fragment is bound to the anchor, so the whole page must rerun
+                st.session_state.full_rerun_requested = True
         else:
             st.session_state.status_message = "You must keep at least one word selected."
             return
     else:
-        selected.append(word_i)
-
-        st.session_state.trial_state[ex_i]["word_params"][word_i] = default_param()
+        state.select(word_i)
+        save_trial_edits(ex_i)
+        schedule_auto_render(ex_i)
 
-    anchor = st.session_state.trial_state[ex_i]["anchor_word"]
-    load_word_into_sliders(ex_i, anchor)
-    st.session_state.status_message = f"Selected {len(selected)} word(s)."
+    load_word_into_sliders(ex_i, state.anchor)
+    st.session_state.status_message = f"Selected {state.n_selected()} word(s)."
 
 def save_sliders_into_word(ex_i, anchor_word_i):
     # Applies the anchor slider values to every selected word
-    selected = st.session_state.trial_state[ex_i]["selected_words"]
+    state = st.session_state.trial_state[ex_i]
+    selected = state.selected()
 
     # read values from anchor sliders
-    new_vals = {p: float(st.session_state.get(slider_key(ex_i, anchor_word_i, p), 0.0)) for p in PARAMS}
+    new_vals = [float(st.session_state.get(slider_key(p), 0.0)) for p in PARAMS]
 
     # apply to all selected words
-    for wi in selected:
-        for p in PARAMS:
-            st.session_state.trial_state[ex_i]["word_params"][wi][p] = new_vals[p]
-            st.session_state[slider_key(ex_i, wi, p)] = new_vals[p]
+    state.apply(new_vals)
+    save_trial_edits(ex_i)
+    schedule_auto_render(ex_i)
 
     st.session_state.status_message = f"Edit in progress: updated {len(selected)} word(s)."
+    if st.session_state.get("auto_preview"):
+        st.session_state.preview_requested = True
 
 def reset_word(ex_i, anchor_word_i):
     # Resets params only for the currently selected words
-    selected = st.session_state.trial_state[ex_i]["selected_words"]
-    for wi in selected:
-        st.session_state.trial_state[ex_i]["word_params"][wi] = default_param()
-        for p in PARAMS:
-            st.session_state[slider_key(ex_i, wi, p)] = 0.0
+    state = st.session_state.trial_state[ex_i]
+    selected = state.selected()
+    state.reset_selected()
+    save_trial_edits(ex_i)
+    schedule_auto_render(ex_i)
 
     # reload sliders from anchor
     load_word_into_sliders(ex_i, anchor_word_i)
@@ -254,10 +627,9 @@ def reset_word(ex_i, anchor_word_i):
 
 def reset_all(ex_i):
     # Resets params for the entire transcript of this trial
-    words = examples[ex_i]["transcript"].split()
-    st.session_state.trial_state[ex_i]["word_params"] = {i: default_param() for i in range(len(words))}
-    st.session_state.trial_state[ex_i]["selected_words"] = [0]
-    st.session_state.trial_state[ex_i]["anchor_word"] = 0
+    trial = examples[ex_i]
+    st.session_state.trial_state[ex_i] = WordParams(len(trial["transcript"].split()), trial["id"])
+    save_trial_edits(ex_i)
     load_word_into_sliders(ex_i, 0)
     st.session_state.status_message = "Parameters reset for all words."
 
@@ -265,40 +637,73 @@ def reset_all(ex_i):
     if ex_i in st.session_state.generated_audio:
         del st.session_state.generated_audio[ex_i]
 
+    # and a render still in flight for the old params must not show up later
+    st.session_state.auto_render_due.pop(ex_i, None)
+    job = st.session_state.render_jobs.pop(ex_i, None)
+    if job is not None and not job.finished.is_set():
+        supersede(job)
+
+def go_to_example(index):
+    st.session_state.example_index = max(0, min(len(examples) - 1, index))
+    st.session_state.status_message = f"Moved to example {st.session_state.example_index + 1}"
+
 def prev_example():
     # Go to the previous trial
-    st.session_state.example_index = max(0, st.session_state.example_index - 1)
-    st.session_state.status_message = f"Moved to example {st.session_state.example_index + 1}"
+    go_to_example(st.session_state.example_index - 1)
 
 def next_example():
     # Go to the next trial
-    st.session_state.example_index = min(len(examples) - 1, st.session_state.example_index + 1)
-    st.session_state.status_message = f"Moved to example {st.session_state.example_index + 1}"
-
-def write_request_json(ex_i):
-    # Writes a request file that the backend script can consume
-    trial = examples[ex_i]
-    words = trial["transcript"].split()
-    wp = st.session_state.trial_state[ex_i]["word_params"]
+    go_to_example(st.session_state.example_index + 1)
 
-    # Convert indices to strings to keep JSON simple
-    wp_json = {str(i): {k: float(v) for k, v in wp[i].items()} for i in range(len(words))}
+def jump_to_example():
+    # "Go to trial" box; positions are 1-based on screen
+    go_to_example(int(st.session_state.jump_to) - 1)
 
-    # Output is overwritten per example for now
-    out_path = f"generated/ex{ex_i+1}_generated.wav"
+def next_unedited_example():
+    index = catalog.store.next_unedited(st.session_state.session_id, st.session_state.example_index)
+    if index is None:
+        st.session_state.status_message = "Every other trial already has edits."
+    else:
+        go_to_example(index)
 
-    req = {
+def build_request(ex_i, out_path):
+    # Request dict for the current params of a trial
+    trial = examples[ex_i]
+    words = trial["transcript"].split()
+    state = st.session_state.trial_state[ex_i]
+    if state.compacted:
+        # "Render all" of a trial the session is not on
+        state = load_trial_state(trial, state)
+
+    # Sparse format: only edited words are sent (see scripts/request_format.py)
+    return {
+        "format": 2,
         "audio_id": trial.get("audio_id", ex_i + 1),
         "baseline_path": trial["baseline"],
-        "word_params": wp_json,
+        "n_words": len(words),
+        "params": PARAMS,
+        "word_edits": state.edits(len(words)),
         "output_path": out_path,
+        # Only words whose params changed since the last submit get re-rendered
+        "render_mode": "per_word",
+        "words": words,
+        # Per-stage timings come back in a sidecar JSON next to the output
+        "trace": True,
     }
 
-    req_path = f"requests/ex{ex_i+1}_request.json"
-    with open(req_path, "w", encoding="utf-8") as f:
-        json.dump(req, f, indent=2)
+def output_path_for(ex_i):
+    # Output is overwritten per example (within this session)
+    return session_path("generated/sessions", f"ex{ex_i+1}_generated.wav")
+
+def write_request_json(ex_i):
+    # Writes a request file that the backend script can consume
+    out_path = output_path_for(ex_i)
+    req = build_request(ex_i, out_path)
 
-    return req_path, out_path
+    req_path = session_path("requests", f"ex{ex_i+1}_request.json")
+    write_json_atomic(req_path, req)
+
+    return req_path, out_path, req
 
 def run_generate_script(request_path):
     # Runs the generator as a separate process
@@ -309,29 +714,875 @@ def run_generate_script(request_path):
     )
     return result.returncode, result.stdout, result.stderr
 
-def submit_all_changes(ex_i):
-    # Generates a new modified audio for the current trial
-    st.session_state.status_message = "Submitting changes..."
+# Set DEMO_GENERATE_WORKER=0 to always use the one-off subprocess above
+USE_GENERATE_WORKER = os.environ.get("DEMO_GENERATE_WORKER", "1") != "0"
+WORKER_TIMEOUT_S = 120.0
+# Warm worker processes for full renders (default: one per core, at most 4)
+GENERATE_WORKERS = int(os.environ.get("DEMO_GENERATE_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+
+class GenerateWorker:
+    # Keeps one warm generate_worker.py process and talks to it over stdin/stdout.
+    # Requests are serialized with a lock; a dead worker is respawned on the next call.
+    # Its stdout is read on a thread into a queue, so replies can be waited
+    # for with a timeout on every platform (select() only takes pipes on Unix).
+
+    def __init__(self):
+        self.proc = None
+        self.lines = None
+        self.lock = threading.Lock()
+
+    def _spawn(self):
+        self.proc = subprocess.Popen(
+            [sys.executable, "scripts/generate_worker.py"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+        )
+        # A fresh queue per process: a killed worker's reader cannot feed the next one
+        self.lines = queue.Queue()
+        threading.Thread(target=self._reader, args=(self.proc.stdout, self.lines),
+                         name="generate-worker-reader", daemon=True).start()
+        hello = self._read_line(WORKER_TIMEOUT_S)
+        if not hello.get("ready"):
+            raise RuntimeError(f"Unexpected worker handshake: {hello}")
+
+    def _kill(self):
+        if self.proc is not None:
+            self.proc.kill()
+            self.proc.wait()
+        self.proc = None
+
+    @staticmethod
+    def _reader(stdout, lines):
+        # Every line the worker prints, then "" once it exits
+        for line in stdout:
+            lines.put(line)
+        lines.put("")
+
+    def _read_line(self, timeout):
+        try:
+            line = self.lines.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError("generate_worker.py did not answer in time") from None
+        if not line:
+            raise BrokenPipeError("generate_worker.py exited")
+        return json.loads(line)
+
+    def _send(self, req):
+        if self.proc is None or self.proc.poll() is not None:
+            self._spawn()
+        self.proc.stdin.write(json.dumps(req) + "\n")
+        self.proc.stdin.flush()
+        return self._read_line(WORKER_TIMEOUT_S)
+
+    def request(self, req):
+        with self.lock:
+            try:
+                return self._send(req)
+            except TimeoutError:
+                self._kill()
+                raise
+            except (OSError, ValueError):
+                # Crashed or garbled worker: start a fresh one and retry once
+                self._kill()
+                return self._send(req)
+
+class WorkerPool:
+    # Hands each request to an idle GenerateWorker, so renders of different
+    # trials run on different cores. A trial goes back to the worker that
+    # rendered it last when that one is free, since it still holds the
+    # trial's per-word renders.
+    AFFINITY_SIZE = 256
+
+    def __init__(self, size):
+        self.workers = [GenerateWorker() for _ in range(size)]
+        self.idle = list(range(size))
+        self.affinity = OrderedDict()
+        # {output_path: worker index}
+        self.cond = threading.Condition()
+
+    def request(self, req):
+        key = req.get("output_path")
+        with self.cond:
+            while not self.idle:
+                self.cond.wait()
+            i = self.affinity.get(key)
+            if i not in self.idle:
+                i = self.idle[-1]
+            self.idle.remove(i)
+        try:
+            return self.workers[i].request(req)
+        finally:
+            with self.cond:
+                self.affinity[key] = i
+                self.affinity.move_to_end(key)
+                while len(self.affinity) > self.AFFINITY_SIZE:
+                    self.affinity.popitem(last=False)
+                self.idle.append(i)
+                self.cond.notify()
+
+@st.cache_resource
+def get_generate_worker():
+    # One pool per server process, shared by all sessions
+    return WorkerPool(GENERATE_WORKERS)
+
+def run_generate(request_path, req=None, worker=None):
+    # Renders through the warm worker, falling back to run_generate_script.
+    # Background threads must pass the worker in (st.cache_resource needs the page thread).
+    if USE_GENERATE_WORKER:
+        if req is None:
+            with open(request_path, "r", encoding="utf-8") as f:
+                req = json.load(f)
+        if worker is None:
+            worker = get_generate_worker()
+        try:
+            resp = worker.request(req)
+        except Exception as e:
+            print(f"Warning: generate worker unavailable ({e}), using subprocess.")
+        else:
+            if resp.get("ok"):
+                # Same lines generate_audio.py prints, so both paths parse alike
+                lines = [f"Generated: {resp['output_path']}", f"Cache: {resp.get('cache', 'off')}"]
+                if "segments_total" in resp:
+                    lines.append(f"Segments: {resp['segments_rendered']}/{resp['segments_total']}")
+                lines.append(f"CPU: {resp.get('cpu_ms', 0.0):.1f} ms")
+                return 0, "\n".join(lines), ""
+            cpu = f"CPU: {resp.get('cpu_ms', 0.0):.1f} ms"
+            return 1, cpu, resp.get("traceback") or resp.get("error", "unknown worker error")
+
+    return run_generate_script(request_path)
+
+def generator_cpu_s(stdout, wall_s):
+    # CPU seconds from the generator's "CPU: 12.3 ms" line, or wall_s without one
+    cpu = parse_generator_output(stdout).get("CPU")
+    return float(cpu.split()[0]) / 1000.0 if cpu else wall_s
+
+def parse_generator_output(stdout):
+    # "Key: value" lines printed by generate_audio.py -> {"Key": "value"}
+    fields = {}
+    for line in (stdout or "").splitlines():
+        key, sep, value = line.partition(": ")
+        if sep:
+            fields[key.strip()] = value.strip()
+    return fields
+
+# Preview: renders only the selected words plus a little context, at a
+# cheaper resample quality, through its own worker so it never waits behind
+# a full render. Results are kept in memory only (PreviewCache).
+PREVIEW_QUALITY = "fast"
+# Optional lower output sample rate for previews (0 = baseline rate)
+PREVIEW_RATE = int(os.environ.get("DEMO_PREVIEW_RATE", "0"))
+PREVIEW_CACHE_MB = 16
+
+class PreviewCache:
+    # LRU of preview WAV bytes keyed by request hash, bounded by total size
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            data = self.entries.get(key)
+            if data is not None:
+                self.entries.move_to_end(key)
+            return data
+
+    def put(self, key, data):
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= len(old)
+            self.entries[key] = data
+            self.nbytes += len(data)
+            while self.nbytes > self.max_bytes and len(self.entries) > 1:
+                _, dropped = self.entries.popitem(last=False)
+                self.nbytes -= len(dropped)
+
+@st.cache_resource
+def get_preview_cache():
+    return PreviewCache(PREVIEW_CACHE_MB * 1024 * 1024)
+
+@st.cache_resource
+def get_preview_worker():
+    return GenerateWorker()
+
+def render_preview(ex_i):
+    # Returns (wav_bytes, elapsed_ms, cached); raises on generator errors
+    start = time.perf_counter()
+    out_path = session_path("generated/sessions", f"ex{ex_i+1}_preview.wav")
+    req = build_request(ex_i, out_path)
+    del req["trace"]
+    req.update(
+        op="preview",
+        preview_words=st.session_state.trial_state[ex_i].selected(),
+        resample_quality=PREVIEW_QUALITY,
+        preview_rate=PREVIEW_RATE,
+    )
 
-    req_path, out_path = write_request_json(ex_i)
+    cache = get_preview_cache()
+    key = request_hash(req)
+    data = cache.get(key)
+    if data is not None:
+        return data, (time.perf_counter() - start) * 1000.0, True
+
+    # Runs in a scheduler slot, which cannot reach st.cache_resource or the session
+    worker = get_preview_worker() if USE_GENERATE_WORKER else None
+    req_path = session_path("requests", f"ex{ex_i+1}_preview.json")
+
+    def generate():
+        resp = None
+        if worker is not None:
+            try:
+                resp = worker.request(req)
+            except Exception as e:
+                print(f"Warning: preview worker unavailable ({e}), using subprocess.")
+        if resp is not None:
+            if not resp.get("ok"):
+                raise RuntimeError(resp.get("error", "unknown worker error"))
+            return base64.b64decode(resp["wav_b64"])
+        write_json_atomic(req_path, req)
+        code, out, err = run_generate_script(req_path)
+        if code != 0:
+            lines = (err or out or "unknown error").strip().splitlines()
+            raise RuntimeError(lines[-1])
+        return Path(out_path).read_bytes()
+
+    data = get_render_scheduler().run(st.session_state.session_id, PREVIEW, generate, timeout=2 * WORKER_TIMEOUT_S)
+    cache.put(key, data)
+    return data, (time.perf_counter() - start) * 1000.0, False
+
+# Auto-render queues a trial's render once its sliders have been still this
+# long; the status fragment checks every AUTO_RENDER_POLL_S
+AUTO_RENDER_DEBOUNCE_S = float(os.environ.get("DEMO_AUTO_RENDER_DEBOUNCE_S", "0.6"))
+AUTO_RENDER_POLL_S = 0.2
+
+# All generator work goes through one scheduler per server process
+# (scripts/render_scheduler.py): one slot per pooled worker plus one kept
+# for previews. Renders of baselines up to SMALL_RENDER_MB go before bigger ones.
+RENDER_SLOTS = GENERATE_WORKERS + 1
+RENDER_MAX_QUEUE = int(os.environ.get("DEMO_RENDER_MAX_QUEUE", "64"))
+RENDER_MAX_QUEUE_PER_SESSION = int(os.environ.get("DEMO_RENDER_MAX_QUEUE_PER_SESSION", "16"))
+SMALL_RENDER_MB = float(os.environ.get("DEMO_SMALL_RENDER_MB", "4"))
+
+@st.cache_resource
+def get_render_scheduler():
+    return RenderScheduler(RENDER_SLOTS, reserved=1, max_queue=RENDER_MAX_QUEUE,
+                           max_per_session=RENDER_MAX_QUEUE_PER_SESSION)
+
+def render_priority(baseline_path):
+    sig = file_signature(baseline_path)
+    return SMALL if sig is not None and sig[1] <= SMALL_RENDER_MB * 1024 * 1024 else FULL
+
+class RenderJob:
+    # One background render of one trial. Jobs for the same trial run in
+    # submission order (the scheduler starts one only when ready()), because
+    # they write the same output file. Only the background thread writes the
+    # status/result fields; the page only reads them.
+
+    def __init__(self, ex_i, req_hash, req, req_path, out_path, worker, after=None):
+        self.ex_i = ex_i
+        self.req_hash = req_hash
+        self.req = req
+        self.req_path = req_path
+        self.out_path = out_path
+        self.worker = worker
+        self.after = after
+        self.status = "queued"  # queued -> running -> done | failed | cancelled
+        self.result = None  # (returncode, stdout, stderr)
+        self.breakdown = None  # generator sidecar + page-side stages, see load_render_breakdown
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.superseded = False
+        self.applied = False
+        self.cpu_s = 0.0  # generator CPU time (wall time if it did not report any)
+        self.finished = threading.Event()
+
+    def ready(self):
+        # Every earlier job of the trial has finished; a cancelled one may
+        # still have a running job before it
+        job = self.after
+        while job is not None:
+            if not job.finished.is_set():
+                return False
+            job = job.after
+        return True
+
+    def cancel(self):
+        # Dropped from the scheduler queue before it started
+        self.status = "cancelled"
+        self.finished_at = time.time()
+        self.finished.set()
+
+    def run(self):
+        try:
+            self.after = None
+            if self.superseded:
+                self.status = "cancelled"
+                return
+            self.started_at = time.time()
+            self.status = "running"
+            self.result = run_generate(self.req_path, self.req, self.worker)
+            self.cpu_s = generator_cpu_s(self.result[1], time.time() - self.started_at)
+            self.status = "done" if self.result[0] == 0 else "failed"
+            if self.status == "done":
+                self.breakdown = load_render_breakdown(self, time.time())
+        except Exception as e:
+            self.result = (1, "", f"{type(e).__name__}: {e}")
+            self.status = "failed"
+        finally:
+            self.finished_at = time.time()
+            self.finished.set()
+
+    def elapsed(self):
+        end = self.finished_at or time.time()
+        return end - self.submitted_at
+
+def load_render_breakdown(job, finished_at):
+    # Reads the generator's per-stage sidecar and adds the stages it cannot see:
+    # time spent queued, and process spawn / IPC around the generator itself
+    sidecar = sidecar_path(job.out_path)
+    try:
+        with open(sidecar, "r", encoding="utf-8") as f:
+            record = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    run_ms = (finished_at - job.started_at) * 1000.0
+    stages = [
+        {"name": "queue", "ms": round((job.started_at - job.submitted_at) * 1000.0, 3), "bytes": 0},
+        {"name": "spawn/IPC", "ms": round(max(0.0, run_ms - record.get("total_ms", 0.0)), 3), "bytes": 0},
+    ]
+    stages += record.get("stages", [])
+    return {"cache": record.get("cache"), "total_ms": round(run_ms, 3), "stages": stages}
+
+def format_breakdown(breakdown, min_ms=0.05):
+    # "queue 0.1 ms · synthesize 8.4 ms · ..." (stages under min_ms are left out)
+    parts = [f"{s['name']} {s['ms']:.1f} ms" for s in breakdown["stages"] if s["ms"] >= min_ms]
+    return " · ".join(parts)
+
+def request_hash(req):
+    return hashlib.sha256(json.dumps(req, sort_keys=True).encode()).hexdigest()
+
+def queue_render(ex_i):
+    # Queues a render of a trial's current params; returns False if the
+    # same render is already in flight. Raises SchedulerBusy when the
+    # server's render queue is full.
+    req_path, out_path, req = write_request_json(ex_i)
+    req_hash = request_hash(req)
+
+    prev = st.session_state.render_jobs.get(ex_i)
+    if prev is not None and not prev.finished.is_set() and prev.req_hash == req_hash:
+        return False
+    after = prev if prev is not None and not prev.finished.is_set() else None
+
+    worker = get_generate_worker() if USE_GENERATE_WORKER else None
+    job = RenderJob(ex_i, req_hash, req, req_path, out_path, worker, after)
+    scheduler = get_render_scheduler()
+    scheduler.submit(st.session_state.session_id, render_priority(req["baseline_path"]), job.run,
+                     ready=job.ready, cancelled=lambda: job.superseded, on_cancel=job.cancel)
+    st.session_state.render_jobs[ex_i] = job
+    if after is not None:
+        # Newer params win; the old job is dropped if it has not started yet
+        supersede(after)
+        scheduler.poke()
+    return True
+
+def supersede(job):
+    # Latest wins: a job that has not started is skipped, one already running
+    # still finishes but is never published. Either way it is counted as stale.
+    job.superseded = True
+    st.session_state.superseded_jobs.append(job)
+
+def schedule_auto_render(ex_i):
+    # Each change pushes the trial's auto-render back by the debounce window,
+    # so a slider drag queues one render once it settles
+    if st.session_state.get("auto_render"):
+        st.session_state.auto_render_due[ex_i] = time.monotonic() + AUTO_RENDER_DEBOUNCE_S
+
+def flush_auto_renders():
+    # Queues every trial whose debounce window has passed
+    now = time.monotonic()
+    for ex_i, due in list(st.session_state.auto_render_due.items()):
+        if due <= now:
+            del st.session_state.auto_render_due[ex_i]
+            if ex_i < len(examples):
+                try:
+                    queue_render(ex_i)
+                except SchedulerBusy:
+                    # Try again after another debounce window
+                    st.session_state.auto_render_due[ex_i] = now + AUTO_RENDER_DEBOUNCE_S
+
+def toggle_auto_render():
+    # Switching auto-render off drops the renders still waiting to settle
+    if not st.session_state.auto_render:
+        st.session_state.auto_render_due.clear()
 
-    code, out, err = run_generate_script(req_path)
+def submit_all_changes(ex_i):
+    # Queues a render of the current trial and returns right away
+    st.session_state.auto_render_due.pop(ex_i, None)
+    try:
+        queued = queue_render(ex_i)
+    except SchedulerBusy as e:
+        st.session_state.status_message = str(e)
+        return
+    if queued:
+        st.session_state.status_message = "Render queued."
+    else:
+        st.session_state.status_message = "This render is already in progress."
+
+def render_all_trials():
+    # Queues every edited trial whose current params are not rendered yet;
+    # queue_render gives each one its priority (render_priority)
+    edited = [
+        ex_i for ex_i, state in st.session_state.trial_state.items()
+        if ex_i < len(examples) and state.has_edits() and state.trial_id == examples[ex_i]["id"]
+    ]
+
+    batch, up_to_date, deferred = [], 0, 0
+    for ex_i in edited:
+        req_hash = request_hash(build_request(ex_i, output_path_for(ex_i)))
+        done_path = st.session_state.generated_audio.get(ex_i)
+        if st.session_state.rendered_hashes.get(ex_i) == req_hash and done_path and Path(done_path).exists():
+            up_to_date += 1
+            continue
+        if deferred:
+            deferred += 1
+            continue
+        try:
+            queue_render(ex_i)
+        except SchedulerBusy:
+            # Queue full: the rest wait for the next "Render all"
+            deferred += 1
+            continue
+        batch.append(ex_i)
+
+    st.session_state.render_all = {"trials": batch, "up_to_date": up_to_date, "started": time.time()}
+    if not edited:
+        st.session_state.status_message = "No edited trials to render."
+    elif not batch:
+        st.session_state.status_message = f"All {up_to_date} edited trial(s) are already up to date."
+    else:
+        st.session_state.status_message = (
+            f"Rendering {len(batch)} edited trial(s) on {GENERATE_WORKERS} worker(s); {up_to_date} already up to date."
+        )
+    if deferred:
+        st.session_state.status_message += f" Server busy: {deferred} trial(s) not queued, try again shortly."
+
+def apply_render_result(job):
+    # Publishes a finished job into the session (runs on the page, not the thread)
+    ex_i = job.ex_i
+    prefix = "" if ex_i == st.session_state.example_index else f"Audio {ex_i + 1}: "
+    code, out, err = job.result
 
     if code != 0:
-        st.session_state.status_message = f"Error running generate_audio.py: {err or out}"
+        # Full stderr is shown under the player; the status line gets its last line
+        lines = (err or out or "unknown error").strip().splitlines()
+        st.session_state.status_message = f"{prefix}Error running generate_audio.py: {lines[-1]}"
         return
 
+    # The generator reports "Cache: hit|miss|off" and "Segments: k/n" on their own lines
+    fields = parse_generator_output(out)
+    cache_result = fields.get("Cache", "off")
+    if cache_result in st.session_state.render_cache_stats:
+        st.session_state.render_cache_stats[cache_result] += 1
+
     # After script runs, we expect the wav to exist in /generated
-    if Path(out_path).exists():
-        st.session_state.generated_audio[ex_i] = out_path
-        st.session_state.status_message = "Generated new modified audio successfully."
+    if Path(job.out_path).exists():
+        st.session_state.generated_audio[ex_i] = job.out_path
+        st.session_state.rendered_hashes[ex_i] = job.req_hash
+        if cache_result == "hit":
+            message = "Loaded previously rendered audio from cache."
+        elif "Segments" in fields:
+            rendered, _, total = fields["Segments"].partition("/")
+            message = f"Generated new modified audio successfully (re-rendered {rendered} of {total} words)."
+        else:
+            message = "Generated new modified audio successfully."
+        st.session_state.status_message = f"{prefix}{message} ({job.elapsed():.1f} s)"
+        if job.breakdown is not None:
+            st.session_state.render_breakdowns[ex_i] = job.breakdown
     else:
-        st.session_state.status_message = f"Script ran but output was not found: {out_path}"
+        st.session_state.status_message = f"{prefix}Script ran but output was not found: {job.out_path}"
+
+def apply_finished_jobs():
+    for job in list(st.session_state.render_jobs.values()):
+        if job.finished.is_set() and not job.applied:
+            job.applied = True
+            if job.status in ("done", "failed"):
+                apply_render_result(job)
+
+    # Superseded jobs are only counted, never published
+    stale = st.session_state.stale_renders
+    running = []
+    for job in st.session_state.superseded_jobs:
+        if not job.finished.is_set():
+            running.append(job)
+        elif job.status == "cancelled":
+            stale["cancelled"] += 1
+        else:
+            stale["discarded"] += 1
+            stale["cpu_s"] += job.cpu_s
+    st.session_state.superseded_jobs = running
+
+def render_all_progress():
+    # Polled while a "Render all" batch runs; publishes each render as it finishes
+    batch = st.session_state.render_all
+    if batch is None or not batch["trials"]:
+        return
+    jobs = [st.session_state.render_jobs.get(ex_i) for ex_i in batch["trials"]]
+    finished = [job for job in jobs if job is None or job.finished.is_set()]
+    apply_finished_jobs()
+
+    total = len(jobs)
+    elapsed = time.time() - batch["started"]
+    st.progress(len(finished) / total, text=f"Rendered {len(finished)} of {total} trial(s) · {elapsed:.1f} s")
+    if len(finished) == total:
+        failed = sum(1 for job in jobs if job is not None and job.status == "failed")
+        st.session_state.status_message = (
+            f"Rendered {total - failed} of {total} edited trial(s) in {elapsed:.1f} s"
+            + (f"; {failed} failed." if failed else ".")
+        )
+        st.session_state.render_all = None
+        # Full rerun so the players pick up the new files
+        st.rerun()
+
+def render_job_status(ex_i):
+    # Polled while the current trial has a render in flight, and all the time
+    # in auto-render mode, which queues the debounced renders from here
+    flush_auto_renders()
+    if ex_i in st.session_state.auto_render_due:
+        st.caption("Auto-render waits for the sliders to settle...")
+    job = st.session_state.render_jobs.get(ex_i)
+    if job is None:
+        return
+    if job.finished.is_set():
+        if not job.applied:
+            # Full rerun so the Modified Audio player picks up the new file
+            st.rerun()
+        if job.status == "failed":
+            st.error("The last render failed. Navigation and editing still work; see details below.")
+            with st.expander("Generator output"):
+                st.code(job.result[2] or job.result[1] or "(no output)")
+        return
+    st.caption(f"Render {job.status} · {job.elapsed():.1f} s")
+
+
+# Waveforms are drawn from precomputed peaks (scripts/waveform_peaks.py),
+# never from the samples, at most WAVEFORM_POINTS buckets wide
+WAVEFORM_POINTS = 1200
+WAVEFORM_CONTEXT_S = 0.25
+# Word boundary lines are only drawn when this few words are in view
+WAVEFORM_MAX_BOUNDARIES = 120
+
+@lru_cache(maxsize=64)
+def word_bounds(path, words, content_key):
+    # Word start/end frames, same as the generator's segment map.
+    # content_key (the file hash) keeps the memo right if the file changes.
+    peaks = get_peaks(path)
+    weights = word_weights(words, len(words))
+    return segment_map_from_energy(peaks["energy"], peaks["nframes"], peaks["framerate"], weights)
+
+def waveform_spec(path, words=None, selected=(), zoom=False):
+    # Plain Vega-Lite spec; building it through altair costs ~60 ms a draw
+    peaks = get_peaks(path)
+    rate = peaks["framerate"]
+    start, end = 0, peaks["nframes"]
+
+    bounds = word_bounds(path, tuple(words), file_sha256(path)) if words else None
+    if bounds is not None and zoom and selected:
+        context = int(WAVEFORM_CONTEXT_S * rate)
+        start = max(0, int(bounds[min(selected)]) - context)
+        end = min(peaks["nframes"], int(bounds[max(selected) + 1]) + context)
+
+    times, mins, maxs = peak_window(peaks, start, end, WAVEFORM_POINTS)
+    x = {"field": "t", "type": "quantitative", "title": "seconds",
+         "scale": {"domain": [start / rate, end / rate], "nice": False}}
+    wave_values = [{"t": t, "min": lo, "max": hi}
+                   for t, lo, hi in zip(times.tolist(), (mins / 32768.0).tolist(), (maxs / 32768.0).tolist())]
+    layers = [{
+        "data": {"values": wave_values},
+        "mark": {"type": "area", "color": "#4b5563"},
+        "encoding": {
+            "x": x,
+            "y": {"field": "min", "type": "quantitative", "scale": {"domain": [-1, 1]}, "axis": None},
+            "y2": {"field": "max"},
+        },
+    }]
+
+    if bounds is not None:
+        secs = bounds / rate
+        if selected:
+            sel_values = [{"start": float(secs[i]), "end": float(secs[i + 1]), "word": words[i]} for i in sorted(selected)]
+            layers.insert(0, {
+                "data": {"values": sel_values},
+                "mark": {"type": "rect", "color": "#1f77ff", "opacity": 0.25},
+                "encoding": {"x": {"field": "start", "type": "quantitative"}, "x2": {"field": "end"},
+                             "tooltip": [{"field": "word"}]},
+            })
+        in_view = secs[(bounds > start) & (bounds < end)]
+        if len(in_view) <= WAVEFORM_MAX_BOUNDARIES:
+            layers.append({
+                "data": {"values": [{"t": t} for t in in_view.tolist()]},
+                "mark": {"type": "rule", "color": "#d1d5db"},
+                "encoding": {"x": {"field": "t", "type": "quantitative"}},
+            })
+
+    return {"height": 110, "layer": layers}
+
+# One stylesheet for the whole word grid. Selected words are primary buttons,
+# modified words carry an (invisible) word-modified marker in their column.
+# A tuple: stylable_container appends to the list it gets, and fragment
+# reruns keep module globals, so each call is handed a fresh list.
+WORD_GRID_CSS = (
+    """
+    button[data-testid="baseButton-secondary"] {
+        background-color: #f0f2f6;
+        color: black;
+        border: 1px solid #ddd;
+    }
+    """,
+    """
+    button[data-testid="baseButton-primary"] {
+        background-color: #1f77ff;
+        color: white;
+        border: 1px solid #1f77ff;
+    }
+    """,
+    """
+    div[data-testid="column"]:has(span.word-modified) button[data-testid="baseButton-secondary"] {
+        background-color: #22c55e;
+        color: white;
+        border: 1px solid #22c55e;
+    }
+    """,
+    """
+    div.element-container:has(span.word-modified) {
+        display: none;
+    }
+    """,
+)
+
+# chunk words per row so it doesn't collapse on small widths
+WORDS_PER_ROW = 6
+
+def render_word_grid(ex_i, transcript_words):
+    # Runs as a fragment; toggling a word reruns only the grid unless the
+    # anchor moved, in which case the sliders need a full rerun too
+    if st.session_state.pop("full_rerun_requested", False):
+        st.rerun()
+
+    state = st.session_state.trial_state[ex_i]
+    selected_words = state.selected_mask().tolist()
+    modified_words = state.modified_mask().tolist()
+
+    # Baseline waveform with the selected words highlighted
+    zoom = st.checkbox("Zoom waveform to selected words", key="waveform_zoom")
+    try:
+        spec = waveform_spec(examples[ex_i]["baseline"], transcript_words, state.selected(), zoom)
+    except (OSError, RuntimeError, EOFError) as e:
+        st.caption(f"Waveform unavailable: {e}")
+    else:
+        st.vega_lite_chart(spec, use_container_width=True)
+
+    # Deferred: streamlit_extras costs ~40 ms of import and only styles the grid
+    from streamlit_extras.stylable_container import stylable_container
+
+    with stylable_container(key="word_grid", css_styles=list(WORD_GRID_CSS)):
+        for start in range(0, len(transcript_words), WORDS_PER_ROW):
+            row_words = transcript_words[start:start + WORDS_PER_ROW]
+            cols = st.columns(WORDS_PER_ROW)
+
+            for j, word in enumerate(row_words):
+                i = start + j
+                is_selected = selected_words[i]
+
+                with cols[j]:
+                    if not is_selected and modified_words[i]:
+                        st.markdown('<span class="word-modified"></span>', unsafe_allow_html=True)
+                    st.button(
+                        word,
+                        key=f"word_ex{ex_i}_{i}",
+                        on_click=toggle_word,
+                        args=(ex_i, i),
+                        type="primary" if is_selected else "secondary",
+                        use_container_width=True,
+                    )
+
+def render_sliders(ex_i, anchor_idx):
+    # Runs as a fragment; sliders reflect the anchor word but apply to all selected words
+    st.slider(
+        "Average Pitch",
+        -2.0,
+        2.0,
+        step=0.1,
+        key=slider_key("average_pitch"),
+        on_change=save_sliders_into_word,
+        args=(ex_i, anchor_idx),
+    )
 
+    st.slider(
+        "Average Range",
+        -2.0,
+        2.0,
+        step=0.1,
+        key=slider_key("average_range"),
+        on_change=save_sliders_into_word,
+        args=(ex_i, anchor_idx),
+    )
+
+    st.slider(
+        "Breathiness",
+        0.0,
+        2.0,
+        step=0.1,
+        key=slider_key("breathiness"),
+        on_change=save_sliders_into_word,
+        args=(ex_i, anchor_idx),
+    )
+
+    st.slider(
+        "Creakiness",
+        0.0,
+        2.0,
+        step=0.1,
+        key=slider_key("creakiness"),
+        on_change=save_sliders_into_word,
+        args=(ex_i, anchor_idx),
+    )
+
+    st.slider(
+        "Nasality",
+        0.0,
+        2.0,
+        step=0.1,
+        key=slider_key("nasality"),
+        on_change=save_sliders_into_word,
+        args=(ex_i, anchor_idx),
+    )
+
+    pc1, pc2 = st.columns(2)
+    with pc1:
+        preview_clicked = st.button("Preview selection", use_container_width=True)
+    with pc2:
+        st.checkbox("Preview on slider change", key="auto_preview")
+
+    fresh = False
+    if preview_clicked or st.session_state.pop("preview_requested", False):
+        try:
+            data, ms, cached = render_preview(ex_i)
+        except Exception as e:
+            st.warning(f"Preview failed: {e}")
+        else:
+            n = st.session_state.trial_state[ex_i].n_selected()
+            st.session_state.preview_audio[ex_i] = {"wav": data, "ms": ms, "cached": cached, "words": n}
+            fresh = True
+
+    preview = st.session_state.preview_audio.get(ex_i)
+    if preview is not None:
+        st.audio(preview["wav"], format="audio/wav", autoplay=fresh)
+        source = "cached" if preview["cached"] else f"{preview['ms']:.0f} ms"
+        st.caption(f"Preview of {preview['words']} selected word(s) with context ({source})")
+
+def format_seconds(value):
+    return "–" if value is None else f"{value:.2f} s"
+
+def format_scheduler_stats(stats):
+    # "Renders: 2/5 running · 3 queued (preview 0, small 1, full 2) · wait p50 ..."
+    depth = ", ".join(f"{name} {stats['depth'][name]}" for name in PRIORITY_NAMES)
+    return (
+        f"Renders (server): {stats['running']}/{stats['slots']} running · {stats['queued']} queued ({depth}) · "
+        f"wait p50 {format_seconds(stats['wait_p50_s'])}, p95 {format_seconds(stats['wait_p95_s'])} · "
+        f"service p50 {format_seconds(stats['service_p50_s'])}, p95 {format_seconds(stats['service_p95_s'])} · "
+        f"{stats['rejected']} rejected, {stats['cancelled']} dropped"
+    )
+
+def render_status_area(ex_i):
+    # Runs as a fragment; polled while a render is in flight
+    cache_stats = st.session_state.render_cache_stats
+    status_lines = [
+        f"Status: {st.session_state.status_message}",
+        f"Render cache: {cache_stats['hit']} hit(s), {cache_stats['miss']} miss(es)",
+    ]
+    job = st.session_state.render_jobs.get(ex_i)
+    if job is not None and not job.finished.is_set():
+        status_lines.append(f"Render {job.status} · {job.elapsed():.1f} s")
+    breakdown = st.session_state.render_breakdowns.get(ex_i)
+    if breakdown is not None:
+        status_lines.append(f"Last render {breakdown['total_ms']:.0f} ms: {format_breakdown(breakdown)}")
+    stale = st.session_state.stale_renders
+    if stale["cancelled"] or stale["discarded"]:
+        status_lines.append(
+            f"Superseded renders: {stale['cancelled']} skipped before starting, "
+            f"{stale['discarded']} discarded after running ({stale['cpu_s']:.1f} s CPU)"
+        )
+    st.info("  \n".join(status_lines))
+
+    sched = get_render_scheduler().stats()
+    st.caption(format_scheduler_stats(sched))
+
+    disk = get_janitor().stats
+    st.caption(
+        f"Disk: {disk['usage_bytes'] / 1e6:.1f} MB of {DISK_BUDGET_MB:g} MB budget · "
+        f"janitor reclaimed {disk['bytes_reclaimed'] / 1e6:.1f} MB in {disk['files_removed']} file(s)"
+    )
+
+def render_trial_search():
+    # Transcript search over the built-in trials and this session's uploads
+    query = st.text_input("Search transcripts", key="trial_search", placeholder="Words from the transcript...")
+    if not query.strip():
+        return
+    hits = catalog.store.search(st.session_state.session_id, query, SEARCH_RESULTS)
+    if not hits:
+        st.caption("No matching trials.")
+    for index, trial in hits:
+        st.button(
+            f"{index + 1}: {trial['transcript'][:80]}",
+            key=f"search_hit_{index}",
+            on_click=go_to_example,
+            args=(index,),
+            use_container_width=True,
+        )
+
+def render_memory_panel():
+    # Session state of every session in this server process, to size per-process memory limits
+    stats = get_session_stats()
+    state = {k: st.session_state[k] for k in st.session_state.keys()}
+    mine = stats.record(st.session_state.session_id, state, expand={"WordParams", "CompactTrial", "RenderJob"})
+    sessions = stats.snapshot()
+    total = sum(r["bytes"] for _, r in sessions)
+    if resource is None:
+        peak_rss = "unavailable"
+    else:
+        # ru_maxrss is in bytes on macOS, KB elsewhere
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak_rss = f"{peak / (1 << 20 if sys.platform == 'darwin' else 1 << 10):.0f} MB"
+
+    with st.expander("Session memory (this server process)"):
+        st.caption(
+            f"This session: {mine['bytes'] / 1024:.1f} KB in {mine['keys']} keys · "
+            f"{len(sessions)} session(s): {total / 1e6:.2f} MB of session state · peak RSS {peak_rss}"
+        )
+        now = time.time()
+        st.table([
+            {
+                "session": sid + (" (you)" if sid == st.session_state.session_id else ""),
+                "keys": r["keys"],
+                "KB": f"{r['bytes'] / 1024:.1f}",
+                "largest keys": ", ".join(f"{k} {b / 1024:.1f} KB" for k, b in r["top"]),
+                "idle s": f"{now - r['updated']:.0f}",
+            }
+            for sid, r in sessions
+        ])
 
 # Current example context
 # refresh examples after potential upload
-examples = built_in_examples + st.session_state.user_trials
+examples = TrialList(catalog.store, st.session_state.session_id, st.session_state.trial_window)
+
+# Publish renders that finished since the last run
+apply_finished_jobs()
 
 # Show a simple warning if some predefined trials were skipped
 if invalid_trial_count > 0:
@@ -355,21 +1606,26 @@ st.session_state.example_index = max(0, min(st.session_state.example_index, len(
 ex_i = st.session_state.example_index
 
 transcript_words = ensure_trial_state(ex_i)
-
-selected_words = st.session_state.trial_state[ex_i]["selected_words"]
-if not selected_words:
-    selected_words = [0]
-    st.session_state.trial_state[ex_i]["selected_words"] = selected_words
+compact_session_state(ex_i)
+
+# Files this session still shows are not evicted while it is open
+user_trials = catalog.store.session_trials(st.session_state.session_id)
+get_janitor().mark_used(
+    [t["baseline"] for t in user_trials]
+    + [t["original"] for t in user_trials]
+    + list(st.session_state.generated_audio.values())
+)
 
 # anchor word comes from explicit state now
-anchor_idx = st.session_state.trial_state[ex_i]["anchor_word"]
+anchor_idx = st.session_state.trial_state[ex_i].anchor
 
 # Clamp anchor just in case
 anchor_idx = max(0, min(anchor_idx, len(transcript_words) - 1))
-st.session_state.trial_state[ex_i]["anchor_word"] = anchor_idx
+st.session_state.trial_state[ex_i].anchor = anchor_idx
 
-# Load slider values the first time we land on this anchor
-if slider_key(ex_i, anchor_idx, "breathiness") not in st.session_state:
+# Load slider values when the trial or the anchor word changes
+slider_anchor = (ex_i, examples[ex_i]["id"], anchor_idx)
+if st.session_state.get("slider_anchor") != slider_anchor or slider_key("breathiness") not in st.session_state:
     load_word_into_sliders(ex_i, anchor_idx)
 
 
@@ -391,113 +1647,21 @@ else:
 st.divider()
 
 st.header("Baseline Audio:")
-st.audio(examples[ex_i]["baseline"])
+# Baselines are checked when trials.csv is imported; the file may have gone since
+if file_signature(examples[ex_i]["baseline"]) is not None:
+    st.audio(examples[ex_i]["baseline"])
+else:
+    st.warning(f"Baseline file is missing: {examples[ex_i]['baseline']}")
 
-# chunk words per row so it doesn't collapse on small widths
-words_per_row = 6
-
-for start in range(0, len(transcript_words), words_per_row):
-    row_words = transcript_words[start:start + words_per_row]
-    cols = st.columns(words_per_row)
-
-    for j, word in enumerate(row_words):
-        i = start + j
-
-        with cols[j]:
-            is_selected = i in selected_words
-            is_modified = word_is_modified(ex_i, i)
-
-            if is_selected:
-                button_css = """
-                button {
-                    background-color: #1f77ff;
-                    color: white;
-                    border: 1px solid #1f77ff;
-                }
-                """
-            elif is_modified:
-                button_css = """
-                button {
-                    background-color: #22c55e;
-                    color: white;
-                    border: 1px solid #22c55e;
-                }
-                """
-            else:
-                button_css = """
-                button {
-                    background-color: #f0f2f6;
-                    color: black;
-                    border: 1px solid #ddd;
-                }
-                """
-
-            with stylable_container(
-                key=f"word_container_{ex_i}_{i}",
-                css_styles=button_css
-            ):
-                st.button(
-                    word,
-                    key=f"word_ex{ex_i}_{i}",
-                    on_click=toggle_word,
-                    args=(ex_i, i),
-                    use_container_width=True,
-                )
+# The grid, the sliders and the status area are fragments: clicking a word or
+# dragging a slider reruns only that part of the page
+st.fragment(render_word_grid)(ex_i, transcript_words)
 
 st.write("")
 st.write("")
 st.write("")
 
-# Sliders reflect the anchor word but apply to all selected words
-st.slider(
-    "Average Pitch",
-    -2.0,
-    2.0,
-    step=0.1,
-    key=slider_key(ex_i, anchor_idx, "average_pitch"),
-    on_change=save_sliders_into_word,
-    args=(ex_i, anchor_idx),
-)
-
-st.slider(
-    "Average Range",
-    -2.0,
-    2.0,
-    step=0.1,
-    key=slider_key(ex_i, anchor_idx, "average_range"),
-    on_change=save_sliders_into_word,
-    args=(ex_i, anchor_idx),
-)
-
-st.slider(
-    "Breathiness",
-    0.0,
-    2.0,
-    step=0.1,
-    key=slider_key(ex_i, anchor_idx, "breathiness"),
-    on_change=save_sliders_into_word,
-    args=(ex_i, anchor_idx),
-)
-
-st.slider(
-    "Creakiness",
-    0.0,
-    2.0,
-    step=0.1,
-    key=slider_key(ex_i, anchor_idx, "creakiness"),
-    on_change=save_sliders_into_word,
-    args=(ex_i, anchor_idx),
-)
-
-st.slider(
-    "Nasality",
-    0.0,
-    2.0,
-    step=0.1,
-    key=slider_key(ex_i, anchor_idx, "nasality"),
-    on_change=save_sliders_into_word,
-    args=(ex_i, anchor_idx),
-)
+st.fragment(render_sliders)(ex_i, anchor_idx)
 
 st.write("")
 st.write("")
@@ -510,11 +1674,36 @@ with c2:
 with c3:
     st.button("Reset all", on_click=reset_all, args=(ex_i,), use_container_width=True)
 
+st.checkbox(
+    f"Auto-render on slider change (after {AUTO_RENDER_DEBOUNCE_S:g} s without changes)",
+    key="auto_render",
+    on_change=toggle_auto_render,
+)
+
+st.button("Render all edited trials", on_click=render_all_trials, use_container_width=True)
+render_all_active = st.session_state.render_all is not None and bool(st.session_state.render_all["trials"])
+st.fragment(render_all_progress, run_every=0.5 if render_all_active else None)()
+
 st.divider()
 
 st.header("Modified Audio:")
+
+# Poll only while this trial has a render that has not been published yet
+current_job = st.session_state.render_jobs.get(ex_i)
+job_pending = current_job is not None and not current_job.applied
+# Auto-render mode keeps polling, since slider fragments cannot start the poll
+if st.session_state.get("auto_render"):
+    status_poll_s = AUTO_RENDER_POLL_S
+else:
+    status_poll_s = 0.5 if job_pending else None
+st.fragment(render_job_status, run_every=status_poll_s)(ex_i)
+
 if ex_i in st.session_state.generated_audio:
     st.audio(st.session_state.generated_audio[ex_i])
+    try:
+        st.vega_lite_chart(waveform_spec(st.session_state.generated_audio[ex_i]), use_container_width=True)
+    except (OSError, RuntimeError, EOFError) as e:
+        st.caption(f"Waveform unavailable: {e}")
 else:
     st.info("No generated audio yet. Click **Submit changes** to create the modified audio.")
 st.divider()
@@ -535,11 +1724,35 @@ with nxt:
         disabled=(st.session_state.example_index == len(examples) - 1),
     )
 
-st.info(f"Status: {st.session_state.status_message}")
+# The box always shows the current position; typing another one jumps there
+st.session_state.jump_to = ex_i + 1
+jump, unedited = st.columns(2)
+with jump:
+    st.number_input("Go to trial", min_value=1, max_value=len(examples), step=1, key="jump_to",
+                    on_change=jump_to_example)
+with unedited:
+    st.write("")
+    st.button("Next unedited >>", on_click=next_unedited_example, use_container_width=True)
+
+render_trial_search()
+
+st.fragment(render_status_area, run_every=status_poll_s)(ex_i)
 
 st.divider()
 
 with st.expander("Word parameters (current example)"):
-    wp = st.session_state.trial_state[ex_i]["word_params"]
-    for i, w in enumerate(transcript_words):
-        st.write(f"{i} ({w}): {wp[i]}")
\ No newline at end of file
+    rows = st.session_state.trial_state[ex_i].rows(0, len(transcript_words))
+    for i, (w, row) in enumerate(zip(transcript_words, rows)):
+        st.write(f"{i} ({w}): {dict(zip(PARAMS, row))}")
+
+    breakdown = st.session_state.render_breakdowns.get(ex_i)
+    if breakdown is not None:
+        st.write("")
+        st.caption(f"Last render: {breakdown['total_ms']:.1f} ms total, cache {breakdown['cache']}")
+        st.table([
+            {"stage": s["name"], "ms": f"{s['ms']:.2f}", "KB": f"{s['bytes'] / 1024:.1f}" if s["bytes"] else ""}
+            for s in breakdown["stages"]
+        ])
+
+# Session state sizes, measured after everything above has run
+render_memory_panel()
@@ -0,0 +1,278 @@
+# scripts/bench_generate.py
+#
+# Benchmark suite for the generate_audio.py pipeline.
+#
+# Synthesizes WAVs over a grid of durations, channel counts and sample
+# rates (plus the bundled audio/baseline/*.wav files) and measures, per
+# stage and end to end:
+#   - wall time (best of --repeat runs)
+#   - throughput in audio-seconds per second
+#   - peak traced memory (tracemalloc, measured in a separate run; the
+#     memory-mapped analysis arrays are not counted)
+#
+# "analysis" is the one-off per-baseline voice_dsp.analyze(); the other
+# stages run against the cached analysis, like every render after the first.
+#
+# Results are written as JSON and compared against a stored baseline; any
+# stage slower or more memory-hungry than the allowed tolerance is listed
+# and the script exits with status 1. So does any render stage slower than
+# real time (--max-rtf).
+#
+# Usage:
+#   python scripts/bench_generate.py                      # quick grid, compare to baseline
+#   python scripts/bench_generate.py --full               # 1 s .. 1 h
+#   python scripts/bench_generate.py --save-baseline      # refresh scripts/bench_baseline.json
+#
+# Timings are machine-specific: refresh the baseline on the machine that runs the comparison.
+
+import argparse
+import glob
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import wave
+from pathlib import Path
+
+import numpy as np
+
+import generate_audio as ga
+import voice_dsp
+import waveform_peaks
+
+HERE = Path(__file__).resolve().parent
+DEFAULT_BASELINE = HERE / "bench_baseline.json"
+
+QUICK_DURATIONS = [1, 10, 60]
+FULL_DURATIONS = [1, 10, 60, 600, 3600]
+CHANNELS = [1, 2]
+RATES = [16000, 44100, 48000]
+
+# Inputs longer than this only get the streaming end-to-end run; the
+# in-memory path would need several times the file size in RAM
+MAX_IN_MEMORY_S = 600
+
+# Representative request: one word spanning the whole input with every
+# param set, so every effect runs on every frame
+WORD_PARAMS = {"0": {"breathiness": 1.0, "creakiness": 0.5, "nasality": 0.5,
+                     "average_pitch": 1.0, "average_range": 0.5}}
+
+# Render stages that must stay faster than real time
+REALTIME_STAGES = ("synthesize", "end_to_end", "end_to_end_stream")
+
+
+def synth_wav(path, seconds, nchannels, rate):
+    # Written in 10 s blocks so even the 1 h inputs never sit in memory
+    rng = np.random.default_rng(seconds * 1000 + nchannels * 10 + rate)
+    total = int(seconds * rate)
+    block = rate * 10
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(nchannels)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        for start in range(0, total, block):
+            n = min(block, total - start)
+            t = (start + np.arange(n)) / rate
+            voice = 6000 * np.sin(2 * np.pi * 180 * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 3 * t))
+            frame = voice + rng.normal(0, 800, n)
+            if nchannels == 2:
+                frame = np.column_stack((frame, frame * 0.8))
+            wf.writeframes(frame.astype(np.int16).tobytes())
+
+
+def wav_seconds(path):
+    with wave.open(str(path), "rb") as wf:
+        return wf.getnframes() / wf.getframerate()
+
+
+def measure(fn, repeat):
+    # Best wall time over `repeat` runs, then one traced run for peak memory
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def bench_case(path, out_dir, repeat, in_memory=True):
+    out_path = str(Path(out_dir) / "out.wav")
+    cold_dir = Path(out_dir) / "cold_analysis"
+    results = {}
+
+    def cold_analysis():
+        shutil.rmtree(cold_dir, ignore_errors=True)
+        voice_dsp.analyze(str(path), cold_dir)
+
+    results["analysis"] = measure(cold_analysis, repeat)
+    shutil.rmtree(cold_dir, ignore_errors=True)
+    an = voice_dsp.get_analysis(str(path))
+
+    if in_memory:
+        audio, framerate, nchannels = ga.read_wav(str(path))
+        _, plan = ga.frame_plan(str(path), audio, framerate, WORD_PARAMS, None)
+        rendered = voice_dsp.render_span(an, plan, audio, 0, len(audio))
+
+        stages = {
+            "read_wav": lambda: ga.read_wav(str(path)),
+            "load_analysis": lambda: voice_dsp.Analysis(an.directory, an.source),
+            "synthesize": lambda: voice_dsp.render_span(an, plan, audio, 0, len(audio)),
+            "write_wav": lambda: ga.write_wav(out_path, rendered, framerate, nchannels),
+            "end_to_end": lambda: ga.process_wav(str(path), out_path, WORD_PARAMS),
+        }
+        for name, fn in stages.items():
+            results[name] = measure(fn, repeat)
+        del audio, rendered
+
+    results["end_to_end_stream"] = measure(
+        lambda: ga.process_wav_streaming(str(path), out_path, WORD_PARAMS), repeat)
+    return results
+
+
+def build_cases(durations):
+    cases = []
+    for seconds in durations:
+        for nchannels in CHANNELS:
+            for rate in RATES:
+                cases.append((f"synth_{seconds}s_{nchannels}ch_{rate}", seconds, nchannels, rate))
+    return cases
+
+
+def run_suite(durations, repeat, bundled):
+    records = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        # Analysis and peak caches of the inputs stay out of generated/
+        voice_dsp.ANALYSIS_DIR = str(Path(tmp) / "analysis")
+        waveform_peaks.PEAKS_DIR = str(Path(tmp) / "peaks")
+        inputs = []
+        for name, seconds, nchannels, rate in build_cases(durations):
+            path = Path(tmp) / f"{name}.wav"
+            synth_wav(path, seconds, nchannels, rate)
+            inputs.append((name, path))
+        if bundled:
+            for path in sorted(glob.glob("audio/baseline/*.wav")):
+                inputs.append((f"bundled_{Path(path).stem}", Path(path)))
+
+        for name, path in inputs:
+            seconds = wav_seconds(path)
+            in_memory = seconds <= MAX_IN_MEMORY_S
+            # Short inputs are noisy: repeat them more
+            n = repeat if seconds >= 60 else repeat * 3
+            print(f"{name} ({seconds:.1f} s)", file=sys.stderr)
+            for stage, (wall, peak) in bench_case(path, tmp, n, in_memory).items():
+                records[f"{name}/{stage}"] = {
+                    "audio_s": round(seconds, 3),
+                    "wall_s": wall,
+                    "audio_s_per_s": seconds / wall if wall > 0 else None,
+                    "rtf": wall / seconds if seconds > 0 else None,
+                    "peak_bytes": peak,
+                }
+            if name.startswith("synth_"):
+                path.unlink()
+    return records
+
+
+def compare(current, baseline, time_tol, mem_tol, min_time):
+    regressions = []
+    for key, cur in sorted(current.items()):
+        ref = baseline.get(key)
+        if ref is None:
+            continue
+        # Short stages are dominated by timer and scheduler noise
+        if max(cur["wall_s"], ref["wall_s"]) >= min_time and cur["wall_s"] > ref["wall_s"] * (1 + time_tol):
+            regressions.append(f"{key}: wall {ref['wall_s'] * 1000:.2f} -> {cur['wall_s'] * 1000:.2f} ms "
+                               f"(+{(cur['wall_s'] / ref['wall_s'] - 1) * 100:.0f}%)")
+        if ref["peak_bytes"] and cur["peak_bytes"] > ref["peak_bytes"] * (1 + mem_tol) \
+                and cur["peak_bytes"] - ref["peak_bytes"] > 64 * 1024:
+            regressions.append(f"{key}: peak {ref['peak_bytes'] / 1e6:.2f} -> {cur['peak_bytes'] / 1e6:.2f} MB "
+                               f"(+{(cur['peak_bytes'] / ref['peak_bytes'] - 1) * 100:.0f}%)")
+    return regressions
+
+
+def slower_than_realtime(records, max_rtf):
+    # Render stages whose wall time per audio-second exceeds max_rtf
+    return [f"{key}: {r['rtf']:.3f} s per audio-second (limit {max_rtf:g})"
+            for key, r in sorted(records.items())
+            if key.rsplit("/", 1)[-1] in REALTIME_STAGES and r["rtf"] and r["rtf"] > max_rtf]
+
+
+def print_table(records):
+    print(f"{'case/stage':<48} {'wall ms':>10} {'audio s/s':>10} {'rtf':>8} {'peak MB':>9}")
+    for key, r in records.items():
+        rate = f"{r['audio_s_per_s']:.0f}" if r["audio_s_per_s"] else "-"
+        rtf = f"{r['rtf']:.4f}" if r.get("rtf") else "-"
+        print(f"{key:<48} {r['wall_s'] * 1000:>10.2f} {rate:>10} {rtf:>8} {r['peak_bytes'] / 1e6:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--full", action="store_true", help="include 10 min and 1 h inputs")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-bundled", action="store_true", help="skip audio/baseline/*.wav")
+    parser.add_argument("--out", default="bench_results.json", help="where to write this run's results")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--time-tolerance", type=float, default=0.30, help="allowed slowdown (0.30 = 30%%)")
+    parser.add_argument("--mem-tolerance", type=float, default=0.10, help="allowed peak-memory growth")
+    parser.add_argument("--min-time", type=float, default=0.05, help="ignore time changes below this many seconds")
+    parser.add_argument("--max-rtf", type=float, default=1.0,
+                        help="fail if a render stage takes longer than this per audio-second (1.0 = real time)")
+    args = parser.parse_args()
+
+    durations = FULL_DURATIONS if args.full else QUICK_DURATIONS
+    records = run_suite(durations, args.repeat, not args.no_bundled)
+    print_table(records)
+
+    too_slow = slower_than_realtime(records, args.max_rtf)
+    if too_slow:
+        print(f"\n{len(too_slow)} render stage(s) slower than real time:")
+        for line in too_slow:
+            print(f"  {line}")
+
+    doc = {
+        "generator_version": ga.GENERATOR_VERSION,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "results": records,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(doc, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=2)
+        print(f"Saved baseline: {args.baseline}")
+        sys.exit(1 if too_slow else 0)
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline first.")
+        sys.exit(1 if too_slow else 0)
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(records, baseline, args.time_tolerance, args.mem_tolerance, args.min_time)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"\nNo regressions against {args.baseline}.")
+    if too_slow:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
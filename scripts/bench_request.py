@@ -0,0 +1,96 @@
+# scripts/bench_request.py
+#
+# Compares the dense (format 1, indent=2) and sparse (format 2, compact)
+# request encodings: file size and the time to go from request text to a
+# per-word value array (json.loads + request_word_params + word_values).
+#
+# Usage:
+#   python scripts/bench_request.py [--repeat 50] [--batch 5000]
+
+import argparse
+import json
+import random
+import time
+
+import numpy as np
+
+import generate_audio as ga
+from request_format import request_word_params
+
+PARAMS = ["breathiness", "creakiness", "nasality", "average_pitch", "average_range"]
+
+# (transcript words, edited words)
+CASES = [(10, 1), (100, 5), (1500, 10), (1500, 150), (1500, 1500)]
+
+
+def make_edits(n_words, n_edited, rng):
+    edits = {}
+    for i in sorted(rng.sample(range(n_words), n_edited)):
+        edits[i] = [rng.choice([0.0, 0.3, -0.5, 1.0, 1.5]) for _ in PARAMS]
+        if not any(edits[i]):
+            edits[i][0] = 0.5
+    return edits
+
+
+def dense_request(n_words, edits):
+    # What demo2.py wrote before format 2
+    wp = {str(i): dict(zip(PARAMS, edits.get(i, [0.0] * len(PARAMS)))) for i in range(n_words)}
+    return {"audio_id": 1, "baseline_path": "audio/baseline/1_vanilla.wav", "word_params": wp,
+            "output_path": "generated/ex1_generated.wav"}
+
+
+def sparse_request(n_words, edits):
+    word_edits = {str(i): [int(v) if v.is_integer() else v for v in vals] for i, vals in edits.items()}
+    return {"format": 2, "audio_id": 1, "baseline_path": "audio/baseline/1_vanilla.wav", "n_words": n_words,
+            "params": PARAMS, "word_edits": word_edits, "output_path": "generated/ex1_generated.wav"}
+
+
+def parse(text):
+    word_params = request_word_params(json.loads(text))
+    return ga.word_values(word_params, ga.word_count(word_params))
+
+
+def best_time(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--batch", type=int, default=5000, help="requests in the batch-file case (100 words, 5 edited)")
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    print(f"{'words':>6} {'edited':>7} {'dense B':>9} {'sparse B':>9} {'dense us':>9} {'sparse us':>10} {'speedup':>8}")
+    for n_words, n_edited in CASES:
+        edits = make_edits(n_words, n_edited, rng)
+        dense = json.dumps(dense_request(n_words, edits), indent=2)
+        sparse = json.dumps(sparse_request(n_words, edits), separators=(",", ":"))
+        assert np.array_equal(parse(dense), parse(sparse))
+
+        t_dense = best_time(lambda: parse(dense), args.repeat)
+        t_sparse = best_time(lambda: parse(sparse), args.repeat)
+        print(f"{n_words:>6} {n_edited:>7} {len(dense):>9} {len(sparse):>9} {t_dense * 1e6:>9.1f} "
+              f"{t_sparse * 1e6:>10.1f} {t_dense / t_sparse:>7.1f}x")
+
+    # Batch files hold one compact request per line either way
+    dense_lines, sparse_lines = [], []
+    for _ in range(args.batch):
+        edits = make_edits(100, 5, rng)
+        dense_lines.append(json.dumps(dense_request(100, edits)))
+        sparse_lines.append(json.dumps(sparse_request(100, edits), separators=(",", ":")))
+    t_dense = best_time(lambda: [parse(line) for line in dense_lines], 3)
+    t_sparse = best_time(lambda: [parse(line) for line in sparse_lines], 3)
+    dense_mb = sum(len(line) + 1 for line in dense_lines) / 1e6
+    sparse_mb = sum(len(line) + 1 for line in sparse_lines) / 1e6
+    print(f"\nbatch of {args.batch} (100 words, 5 edited): {dense_mb:.2f} MB -> {sparse_mb:.2f} MB, "
+          f"parse {t_dense * 1000:.0f} -> {t_sparse * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# scripts/bench_resample.py
+#
+# Benchmarks change_speed qualities against "nearest" (the original
+# nearest-sample implementation): speed in audio-seconds per second and
+# aliasing of a tone close to Nyquist when reading faster than 1x.
+#
+# Usage:
+#   python scripts/bench_resample.py [--seconds 60] [--rate 44100] [--factor 1.2]
+
+import argparse
+import time
+
+import numpy as np
+
+import resample
+
+
+def tone(rate, seconds, freq):
+    t = np.arange(int(rate * seconds)) / rate
+    return (12000 * np.sin(2 * np.pi * freq * t)).astype(np.int16)
+
+
+def alias_db(out, rate, keep_hz):
+    # Energy above keep_hz relative to total, in dB (lower is better). When
+    # reading at 1.2x a 0.45 * rate tone lands above Nyquist, so anything
+    # left in the output is aliasing.
+    spec = np.abs(np.fft.rfft(out.astype(np.float64) * np.hanning(len(out)))) ** 2
+    freqs = np.fft.rfftfreq(len(out), 1.0 / rate)
+    alias = spec[freqs < keep_hz].sum()
+    return 10 * np.log10(max(alias, 1e-30) / spec.sum())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--rate", type=int, default=44100)
+    parser.add_argument("--factor", type=float, default=1.2)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    audio = rng.integers(-12000, 12000, int(args.rate * args.seconds)).astype(np.int16)
+    probe = tone(args.rate, 1.0, 0.45 * args.rate)
+
+    print(f"{args.seconds:g} s mono @ {args.rate} Hz, factor {args.factor}")
+    print(f"{'quality':<8} {'taps':>5} {'bank setup':>11} {'best time':>10} {'x realtime':>11} {'alias dB':>9}")
+    for quality in resample.QUALITIES:
+        taps = 1
+        setup = 0.0
+        if quality != "nearest":
+            resample.filter_bank.cache_clear()
+            start = time.perf_counter()
+            bank, half = resample.filter_bank(args.factor, quality)
+            setup = time.perf_counter() - start
+            taps = 2 * half
+
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            resample.change_speed(audio, args.factor, quality)
+            best = min(best, time.perf_counter() - start)
+
+        # A tone that ends up above the new Nyquist should vanish, not fold back
+        alias = "n/a"
+        if args.factor > 1.0:
+            out = resample.change_speed(probe, args.factor, quality)
+            alias = f"{alias_db(out, args.rate, 0.45 * args.rate / args.factor * 0.9):.1f}"
+
+        print(f"{quality:<8} {taps:>5} {setup * 1000:>9.2f}ms {best:>9.3f}s "
+              f"{args.seconds / best:>10.0f}x {alias:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# scripts/bench_startup.py
+#
+# Startup benchmark for the app and the generator.
+#
+# Each case runs in a fresh interpreter with -X importtime. What the case
+# itself imports (everything after the interpreter's own startup and the
+# site-packages .pth hooks) is summed from the top-level entries, and
+# the best of --repeat runs is compared against scripts/startup_budget.json:
+#   - "import_ms": the most a case may spend importing
+#   - "forbidden": modules the case must not import at all (e.g. numpy for
+#     a render-cache hit)
+# Any case over budget or importing a forbidden module is listed and the
+# script exits with status 1.
+#
+# Cases:
+#   generate_audio_help    python scripts/generate_audio.py --help
+#   generate_audio_import  import generate_audio
+#   generate_worker_import import generate_worker (paid once per worker)
+#   generate_cache_hit     a --request render served from the render cache
+#   demo2_imports          the module-level imports of demo2.py, without running the page
+#
+# Usage:
+#   python scripts/bench_startup.py [--repeat 5] [--budget scripts/startup_budget.json]
+#
+# Like bench_baseline.json, the budget is machine-specific: it has headroom
+# for noise, but refresh it (by hand) on the machine that runs the check.
+
+import argparse
+import ast
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent
+DEFAULT_BUDGET = HERE / "startup_budget.json"
+MARKER = "--- bench_startup ---"
+
+
+def demo2_imports():
+    # demo2.py's module-level import statements, as source
+    tree = ast.parse((ROOT / "demo2.py").read_text(encoding="utf-8"))
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def cache_hit_request(tmp):
+    # A request whose render is already in a private render cache
+    baseline = sorted(glob.glob(str(ROOT / "audio" / "baseline" / "*.wav")))[0]
+    req = {"format": 2, "audio_id": 1, "baseline_path": baseline, "n_words": 3,
+           "params": ["breathiness", "creakiness", "nasality", "average_pitch", "average_range"],
+           "word_edits": {"1": [0.5, 0, 0, 0, 0]}, "output_path": str(Path(tmp) / "out.wav")}
+    path = Path(tmp) / "request.json"
+    path.write_text(json.dumps(req), encoding="utf-8")
+    return str(path)
+
+
+def cases(tmp):
+    prelude = f"import sys; sys.path.insert(0, {str(HERE)!r})"
+    script = str(HERE / "generate_audio.py")
+    run_script = "import runpy; runpy.run_path({!r}, run_name='__main__')".format(script)
+    request = cache_hit_request(tmp)
+    return {
+        "generate_audio_help": f"sys.argv = [{script!r}, '--help']\n{run_script}",
+        "generate_audio_import": "import generate_audio",
+        "generate_worker_import": "import generate_worker",
+        "generate_cache_hit": f"sys.argv = [{script!r}, '--request', {request!r}]\n{run_script}",
+        "demo2_imports": demo2_imports(),
+    }, prelude
+
+
+def run_case(prelude, code, env):
+    # (import ms, {imported module names}) for one fresh interpreter
+    source = f"{prelude}\nprint({MARKER!r}, file=sys.stderr, flush=True)\n{code}"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", source], cwd=ROOT, env=env,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"case failed (exit {proc.returncode}):\n{proc.stderr[-2000:]}")
+    lines = proc.stderr.split(MARKER, 1)[1].splitlines()
+    total_us, modules = 0, set()
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        modules.add(name.strip())
+        if not name[1:].startswith(" "):
+            total_us += int(cumulative)
+    return total_us / 1000.0, modules
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget", default=str(DEFAULT_BUDGET))
+    args = parser.parse_args()
+
+    with open(args.budget, "r", encoding="utf-8") as f:
+        budget = json.load(f)["cases"]
+
+    failures = []
+    print(f"{'case':<24} {'import ms':>10} {'budget ms':>10}  forbidden imports")
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, RENDER_CACHE_DIR=str(Path(tmp) / "cache"),
+                   ANALYSIS_DIR=str(Path(tmp) / "analysis"), PEAKS_DIR=str(Path(tmp) / "peaks"))
+        all_cases, prelude = cases(tmp)
+        # Fills the render cache (and compiles every .pyc) before anything is timed
+        for code in all_cases.values():
+            run_case(prelude, code, env)
+
+        for name, code in all_cases.items():
+            runs = [run_case(prelude, code, env) for _ in range(args.repeat)]
+            best_ms = min(ms for ms, _ in runs)
+            modules = set().union(*(m for _, m in runs))
+            limits = budget.get(name, {})
+            limit_ms = limits.get("import_ms")
+            bad = sorted(m for m in limits.get("forbidden", []) if m in modules)
+            print(f"{name:<24} {best_ms:>10.1f} {limit_ms if limit_ms is not None else '-':>10}  "
+                  f"{', '.join(bad) or '-'}")
+            if limit_ms is not None and best_ms > limit_ms:
+                failures.append(f"{name}: imports take {best_ms:.1f} ms (budget {limit_ms} ms)")
+            if bad:
+                failures.append(f"{name}: imports {', '.join(bad)}")
+
+    if failures:
+        print(f"\n{len(failures)} startup regression(s):")
+        for line in failures:
+            print(f"  {line}")
+        sys.exit(1)
+    print("\nWithin the startup budget.")
+
+
+if __name__ == "__main__":
+    main()
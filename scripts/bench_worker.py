@@ -0,0 +1,108 @@
+# scripts/bench_worker.py
+#
+# Compares per-request render latency of the one-off subprocess path
+# (cold: new interpreter per request) against the warm generate_worker.py.
+#
+# The render cache is switched off (RENDER_CACHE_MAX_MB=0), so every
+# request is a real render rather than a cache lookup. The analysis and
+# peak caches live in the temporary directory, not under generated/.
+#
+# Usage:
+#   python scripts/bench_worker.py [--repeat 10] [--baseline audio/baseline/1_vanilla.wav]
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+
+
+def make_request(baseline, out_dir, n):
+    return {
+        "audio_id": n,
+        "baseline_path": baseline,
+        "word_params": {"0": {"breathiness": 1.0, "creakiness": 0.0, "nasality": 0.0,
+                              "average_pitch": 0.5, "average_range": 0.0}},
+        "output_path": str(Path(out_dir) / f"bench_{n}.wav"),
+    }
+
+
+def bench_env(out_dir):
+    return dict(os.environ, RENDER_CACHE_MAX_MB="0", RENDER_CACHE_DIR=str(Path(out_dir) / "cache"),
+                ANALYSIS_DIR=str(Path(out_dir) / "analysis"), PEAKS_DIR=str(Path(out_dir) / "peaks"))
+
+
+def bench_cold(baseline, out_dir, repeat):
+    times = []
+    for n in range(repeat):
+        req_path = Path(out_dir) / f"bench_{n}.json"
+        req_path.write_text(json.dumps(make_request(baseline, out_dir, n)), encoding="utf-8")
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, str(HERE / "generate_audio.py"), "--request", str(req_path)],
+            check=True,
+            capture_output=True,
+            env=bench_env(out_dir),
+        )
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def bench_warm(baseline, out_dir, repeat):
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, str(HERE / "generate_worker.py")],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+        bufsize=1,
+        env=bench_env(out_dir),
+    )
+    proc.stdout.readline()
+    spawn = time.perf_counter() - start
+
+    times = []
+    try:
+        for n in range(repeat):
+            start = time.perf_counter()
+            proc.stdin.write(json.dumps(make_request(baseline, out_dir, n)) + "\n")
+            proc.stdin.flush()
+            resp = json.loads(proc.stdout.readline())
+            times.append(time.perf_counter() - start)
+            if not resp.get("ok"):
+                raise RuntimeError(resp.get("error"))
+    finally:
+        proc.stdin.close()
+        proc.wait()
+    return spawn, times
+
+
+def fmt(times):
+    return (f"median {statistics.median(times) * 1000:7.1f} ms  "
+            f"min {min(times) * 1000:7.1f} ms  max {max(times) * 1000:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--baseline", default="audio/baseline/1_vanilla.wav")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        cold = bench_cold(args.baseline, out_dir, args.repeat)
+        spawn, warm = bench_warm(args.baseline, out_dir, args.repeat)
+
+    print(f"cold (subprocess per request): {fmt(cold)}")
+    print(f"warm worker startup:           {spawn * 1000:7.1f} ms (once)")
+    print(f"warm worker first request:     {warm[0] * 1000:7.1f} ms")
+    print(f"warm worker (per request):     {fmt(warm)}")
+
+
+if __name__ == "__main__":
+    main()
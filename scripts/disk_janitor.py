@@ -0,0 +1,146 @@
+# scripts/disk_janitor.py
+#
+# Keeps the app's working directories (generated/, requests/, uploads/)
+# under a disk budget.
+#
+# A sweep adds up every file under the roots; while the total is over
+# budget it deletes the least recently used files that are older than
+# min_age_s. "Used" is the later of the file mtime and the last time the app
+# reported the path through mark_used(), so files a live session still
+# shows are kept. Files pinned() returns are never removed: uploads that
+# trials in the trial store still point at stay until their session is
+# pruned from it, however long the session sits idle. Empty directories
+# left behind (old session folders) are removed too.
+#
+# Usage (one sweep, from the repo root):
+#   python scripts/disk_janitor.py --budget-mb 500 [--dry-run] [--trial-db data/trials.sqlite]
+
+import argparse
+import os
+import threading
+import time
+from pathlib import Path
+
+from trial_store import TrialStore
+
+
+class Janitor:
+    def __init__(self, roots, budget_bytes, min_age_s=900.0, pinned=None):
+        self.roots = [Path(r) for r in roots]
+        self.budget_bytes = budget_bytes
+        self.min_age_s = min_age_s
+        self.pinned = pinned
+        self.used = {}
+        # {absolute path: last time the app reported it}
+        self.lock = threading.Lock()
+        self.stats = {"sweeps": 0, "files_removed": 0, "bytes_reclaimed": 0, "usage_bytes": 0, "last_sweep": None}
+        self.thread = None
+
+    def mark_used(self, paths):
+        now = time.time()
+        with self.lock:
+            for p in paths:
+                if p:
+                    self.used[os.path.abspath(p)] = now
+
+    def scan(self):
+        # [(last_used, size, path)] for every file under the roots
+        with self.lock:
+            used = dict(self.used)
+        files = []
+        for root in self.roots:
+            for dirpath, _, names in os.walk(root):
+                for name in names:
+                    path = os.path.join(dirpath, name)
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    last = max(st.st_mtime, used.get(os.path.abspath(path), 0.0))
+                    files.append((last, st.st_size, path))
+        return files
+
+    def sweep(self, now=None, dry_run=False):
+        # One pass; returns {"files_removed", "bytes_reclaimed", "usage_bytes"}
+        now = time.time() if now is None else now
+        files = self.scan()
+        total = sum(size for _, size, _ in files)
+        removed = reclaimed = 0
+
+        if total > self.budget_bytes:
+            pinned = {os.path.abspath(p) for p in self.pinned()} if self.pinned else set()
+            for last, size, path in sorted(files):
+                if total <= self.budget_bytes or now - last < self.min_age_s:
+                    break
+                if os.path.abspath(path) in pinned:
+                    continue
+                if not dry_run:
+                    try:
+                        os.unlink(path)
+                    except FileNotFoundError:
+                        continue
+                total -= size
+                removed += 1
+                reclaimed += size
+
+        if not dry_run:
+            self.remove_empty_dirs()
+            with self.lock:
+                # Forget paths that no longer exist
+                self.used = {p: t for p, t in self.used.items() if os.path.exists(p)}
+                self.stats["sweeps"] += 1
+                self.stats["files_removed"] += removed
+                self.stats["bytes_reclaimed"] += reclaimed
+                self.stats["usage_bytes"] = total
+                self.stats["last_sweep"] = now
+        return {"files_removed": removed, "bytes_reclaimed": reclaimed, "usage_bytes": total}
+
+    def remove_empty_dirs(self):
+        for root in self.roots:
+            for dirpath, dirnames, filenames in os.walk(root, topdown=False):
+                if Path(dirpath) != root and not dirnames and not filenames:
+                    try:
+                        os.rmdir(dirpath)
+                    except OSError:
+                        pass
+
+    def start(self, interval_s):
+        # Sweeps every interval_s seconds on a daemon thread
+        def loop():
+            while True:
+                try:
+                    result = self.sweep()
+                    if result["files_removed"]:
+                        print(f"Janitor: removed {result['files_removed']} file(s), reclaimed "
+                              f"{result['bytes_reclaimed'] / 1e6:.1f} MB; {result['usage_bytes'] / 1e6:.1f} MB in use")
+                except Exception as e:
+                    print(f"Warning: janitor sweep failed ({e})")
+                time.sleep(interval_s)
+
+        self.thread = threading.Thread(target=loop, name="disk-janitor", daemon=True)
+        self.thread.start()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget-mb", type=float, required=True)
+    parser.add_argument("--min-age-s", type=float, default=900.0, help="never remove files used more recently")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be removed")
+    parser.add_argument("--trial-db", default="data/trials.sqlite",
+                        help="never remove files its trials point at (skipped if the file does not exist)")
+    parser.add_argument("roots", nargs="*", default=["generated", "requests", "uploads"])
+    args = parser.parse_args()
+
+    store = TrialStore(args.trial_db) if os.path.exists(args.trial_db) else None
+    janitor = Janitor(args.roots, int(args.budget_mb * 1024 * 1024), args.min_age_s,
+                      store.referenced_files if store else None)
+    result = janitor.sweep(dry_run=args.dry_run)
+    if store:
+        store.close()
+    verb = "Would remove" if args.dry_run else "Removed"
+    print(f"{verb} {result['files_removed']} file(s), {result['bytes_reclaimed'] / 1e6:.1f} MB; "
+          f"{result['usage_bytes'] / 1e6:.1f} MB in use (budget {args.budget_mb:g} MB)")
+
+
+if __name__ == "__main__":
+    main()
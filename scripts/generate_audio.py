@@ -1,48 +1,80 @@
 # scripts/generate_audio.py
 #
 # Cloud-safe version (no audioop).
-# Uses numpy for demo effects.
+# Uses numpy for the voice-quality engine in voice_dsp.py: each word's span
+# gets its own average_pitch, average_range, breathiness, creakiness and
+# nasality, and unedited words are copied from the baseline unchanged. The
+# per-baseline analysis is computed once and cached on disk.
 #
-# Effects:
-# 1) Adds a beep at the beginning
-# 2) Slight speed change
-# 3) Slight volume change
+# With "render_mode": "per_word" the previous render of each trial is kept
+# and only the words whose params changed are synthesized again; the output
+# is the same as a full render.
+#
+# Requests may be dense (format 1) or sparse (format 2); see request_format.py.
 
 import argparse
+import io
 import json
-import math
 import os
+import sys
+import time
 import wave
-import numpy as np
+from collections import OrderedDict
 from pathlib import Path
 
+import resample
+import voice_dsp
+from lazy_import import finish_import, lazy
+from render_cache import RenderCache, file_sha256
+from render_trace import NULL_TRACE, Trace, append_trace_log, write_sidecar
+from request_format import WordEdits, request_format, request_word_params
+from waveform_peaks import get_peaks
+from word_segments import cached_segment_map, segment_map_from_energy, word_weights
 
-def clamp(x: float, lo: float, hi: float) -> float:
-    return lo if x < lo else hi if x > hi else x
+# Only needed once samples are touched, or for --batch
+np = lazy("numpy")
+multiprocessing = lazy("multiprocessing")
 
+# Bump whenever a change alters the rendered samples, so cached renders are not reused
+GENERATOR_VERSION = "4"
 
-def compute_intensity(word_params: dict) -> float:
-    if not word_params:
-        return 0.0
+# Render cache location and disk budget (RENDER_CACHE_MAX_MB=0 disables it)
+RENDER_CACHE_DIR = os.environ.get("RENDER_CACHE_DIR", "generated/cache")
+RENDER_CACHE_MAX_MB = float(os.environ.get("RENDER_CACHE_MAX_MB", "200"))
 
-    total = 0.0
-    count = 0
+# Baselines with more audio data than this are rendered block by block,
+# using about STREAM_BUFFER_MB of working memory
+STREAM_THRESHOLD_MB = float(os.environ.get("STREAM_THRESHOLD_MB", "32"))
+STREAM_BUFFER_MB = float(os.environ.get("STREAM_BUFFER_MB", "8"))
+
+# Traced renders (request "trace": true or --trace) also append to this JSONL file if set
+GENERATE_TRACE_LOG = os.environ.get("GENERATE_TRACE_LOG", "")
 
-    for _, pmap in word_params.items():
-        if not isinstance(pmap, dict):
-            continue
-        for _, v in pmap.items():
-            try:
-                total += float(v)
-                count += 1
-            except Exception:
-                pass
 
-    if count == 0:
-        return 0.0
+def word_count(word_params):
+    return word_params.n_words if isinstance(word_params, WordEdits) else len(word_params)
 
-    avg = total / count
-    return clamp(avg / 2.0, 0.0, 1.0)
+
+def word_values(word_params, n_words):
+    # (n_words, len(voice_dsp.PARAMS)) float32 values; missing params are 0.0
+    values = np.zeros((n_words, len(voice_dsp.PARAMS)), dtype=np.float32)
+    columns = {p: j for j, p in enumerate(voice_dsp.PARAMS)}
+    for wi, pmap in (word_params or {}).items():
+        if not isinstance(pmap, dict):
+            continue
+        try:
+            i = int(wi)
+        except ValueError:
+            continue
+        if not 0 <= i < n_words:
+            continue
+        for p, v in pmap.items():
+            if p in columns:
+                try:
+                    values[i, columns[p]] = float(v)
+                except (TypeError, ValueError):
+                    pass
+    return values
 
 
 def read_wav(path):
@@ -67,77 +99,480 @@ def read_wav(path):
 def write_wav(path, audio, framerate, nchannels):
     Path(path).parent.mkdir(parents=True, exist_ok=True)
 
-    if nchannels == 2:
-        audio = audio.reshape(-1)
-
-    audio = audio.astype(np.int16)
+    # writeframes takes any buffer, so int16 C-contiguous input is written without a copy
+    audio = np.ascontiguousarray(audio, dtype=np.int16)
 
     with wave.open(path, "wb") as wf:
         wf.setnchannels(nchannels)
         wf.setsampwidth(2)
         wf.setframerate(framerate)
-        wf.writeframes(audio.tobytes())
+        wf.writeframes(audio)
 
 
-def make_beep(sample_rate, duration_s, freq, nchannels):
-    t = np.linspace(0, duration_s, int(sample_rate * duration_s), endpoint=False)
-    beep = 12000 * np.sin(2 * np.pi * freq * t)
-    beep = beep.astype(np.int16)
+# Decoded baselines kept per process (batch workers, the warm worker),
+# keyed by (path, size, mtime)
+BASELINE_MEMO = 8
+_decoded_baselines = OrderedDict()
 
-    if nchannels == 2:
-        beep = np.column_stack((beep, beep))
 
-    return beep
+def read_wav_memo(path):
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    if key in _decoded_baselines:
+        _decoded_baselines.move_to_end(key)
+        return _decoded_baselines[key]
 
+    decoded = read_wav(path)
+    _decoded_baselines[key] = decoded
+    while len(_decoded_baselines) > BASELINE_MEMO:
+        _decoded_baselines.popitem(last=False)
+    return decoded
 
-def change_speed(audio, factor):
+
+def change_speed(audio, factor, quality=resample.DEFAULT_QUALITY):
     """
-    Simple resampling-based speed change.
+    Resampling-based speed change (see resample.py for the qualities).
     """
-    indices = np.arange(0, len(audio), factor)
-    indices = indices[indices < len(audio)].astype(int)
-    return audio[indices]
-
-
-def process_wav(baseline_path, output_path, word_params):
-    audio, framerate, nchannels = read_wav(baseline_path)
+    return resample.change_speed(audio, factor, quality)
+
+
+def frame_plan(baseline_path, audio, framerate, word_params, words, key=None, trace=NULL_TRACE):
+    # (analysis, FramePlan) for a request; audio=None finds the word
+    # boundaries from the cached waveform peaks instead of the samples
+    if key is None:
+        with trace.stage("hash"):
+            key = file_sha256(baseline_path)
+    with trace.stage("analysis"):
+        an = voice_dsp.get_analysis(baseline_path, key=key)
+
+    n_words = word_count(word_params)
+    with trace.stage("segment_map"):
+        if n_words == 0:
+            bounds = np.zeros(1, dtype=np.int64)
+        elif audio is None:
+            bounds = segment_map_from_energy(get_peaks(baseline_path)["energy"], an.nsamples, framerate,
+                                             word_weights(words, n_words))
+        else:
+            bounds = cached_segment_map(key, audio, framerate, words, n_words)
+    return an, voice_dsp.FramePlan(an, bounds, word_values(word_params, n_words))
+
+
+def process_wav(baseline_path, output_path, word_params, load=read_wav, trace=NULL_TRACE, words=None):
+    with trace.stage("read_wav") as st:
+        audio, framerate, nchannels = load(baseline_path)
+        st.nbytes = audio.nbytes
+
+    an, plan = frame_plan(baseline_path, audio, framerate, word_params, words, trace=trace)
+
+    with trace.stage("synthesize") as st:
+        audio = voice_dsp.render_span(an, plan, audio, 0, len(audio))
+        st.nbytes = audio.nbytes
+
+    with trace.stage("write_wav") as st:
+        write_wav(output_path, audio, framerate, nchannels)
+        st.nbytes = audio.nbytes
+
+
+def process_wav_streaming(baseline_path, output_path, word_params, buffer_bytes=None, trace=NULL_TRACE,
+                          words=None):
+    # Same output as process_wav, but reads, synthesizes and writes one block
+    # at a time so memory stays around buffer_bytes for any input length
+    if buffer_bytes is None:
+        buffer_bytes = STREAM_BUFFER_MB * 1024 * 1024
+
+    with wave.open(baseline_path, "rb") as src:
+        nchannels = src.getnchannels()
+        sampwidth = src.getsampwidth()
+        framerate = src.getframerate()
+        nframes = src.getnframes()
+
+        if sampwidth != 2:
+            raise RuntimeError("Only 16-bit PCM WAV supported in demo.")
+        if nchannels not in (1, 2):
+            raise RuntimeError("Streaming mode supports mono or stereo WAV only.")
+
+        an, plan = frame_plan(baseline_path, None, framerate, word_params, words, trace=trace)
+        chunk_frames = voice_dsp.span_chunk_frames(an, buffer_bytes)
+        block = chunk_frames * an.hop
+
+        # One output block, reused for every block
+        buf = np.empty((block, nchannels) if nchannels == 2 else block, dtype=np.int16)
+
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        with wave.open(output_path, "wb") as dst:
+            dst.setnchannels(nchannels)
+            dst.setsampwidth(2)
+            dst.setframerate(framerate)
+
+            for lo in range(0, nframes, block):
+                hi = min(lo + block, nframes)
+                with trace.stage("read_wav") as st:
+                    src.setpos(lo)
+                    base = np.frombuffer(src.readframes(hi - lo), dtype=np.int16)
+                    if nchannels == 2:
+                        base = base.reshape(-1, 2)
+                    st.nbytes = base.nbytes
+                with trace.stage("synthesize") as st:
+                    out = voice_dsp.render_span(an, plan, base, lo, hi, chunk_frames, out=buf[:hi - lo])
+                    st.nbytes = out.nbytes
+                with trace.stage("write_wav") as st:
+                    dst.writeframes(out)
+                    st.nbytes = out.nbytes
+
+
+# Per-word rendering keeps the previous output of each trial; a resubmit
+# only re-synthesizes the spans of words whose params changed (see
+# voice_dsp.FramePlan.word_spans), which gives the same samples as a full render.
+PER_WORD_TRIALS = 16
+
+
+class PerWordRenderer:
+    def __init__(self, max_trials=PER_WORD_TRIALS):
+        self.max_trials = max_trials
+        self.trials = OrderedDict()
+        # {trial_key: {"baseline": hash, "bounds": array, "values": array, "audio": array}}
+
+    def render(self, trial_key, baseline_path, output_path, word_params, words=None, load=read_wav_memo,
+               trace=NULL_TRACE):
+        with trace.stage("read_wav") as st:
+            audio, framerate, nchannels = load(baseline_path)
+            st.nbytes = audio.nbytes
+        with trace.stage("hash"):
+            baseline_key = file_sha256(baseline_path)
+
+        an, plan = frame_plan(baseline_path, audio, framerate, word_params, words, baseline_key, trace)
+        n_words = word_count(word_params)
+        values = word_values(word_params, n_words)
+        bounds = cached_segment_map(baseline_key, audio, framerate, words, n_words) if n_words else None
+
+        prev = self.trials.pop(trial_key, None)
+        if prev is None or prev["baseline"] != baseline_key or prev["values"].shape != values.shape \
+                or not np.array_equal(prev["bounds"], bounds):
+            prev = None
+
+        with trace.stage("synthesize") as st:
+            if prev is None:
+                out = voice_dsp.render_span(an, plan, audio, 0, len(audio))
+                rendered = n_words
+                st.nbytes = out.nbytes
+            else:
+                out = prev["audio"]
+                changed = np.flatnonzero((prev["values"] != values).any(axis=1))
+                for lo, hi in plan.word_spans(changed):
+                    voice_dsp.render_span(an, plan, audio[lo:hi], lo, hi, out=out[lo:hi])
+                    st.nbytes += (hi - lo) * out.itemsize * nchannels
+                rendered = len(changed)
+
+        self.trials[trial_key] = {"baseline": baseline_key, "bounds": bounds, "values": values, "audio": out}
+        while len(self.trials) > self.max_trials:
+            self.trials.popitem(last=False)
+
+        with trace.stage("write_wav") as st:
+            write_wav(output_path, out, framerate, nchannels)
+            st.nbytes = out.nbytes
+        return {"segments_rendered": rendered, "segments_total": n_words}
+
+
+_per_word_renderer = PerWordRenderer()
+
+
+# Preview ("op": "preview"): only the "preview_words" span plus
+# PREVIEW_CONTEXT_S on each side, optionally resampled down to
+# "preview_rate" with a cheaper resample quality. Nothing touches the
+# render cache; the result is WAV bytes.
+PREVIEW_CONTEXT_S = 0.25
+PREVIEW_QUALITY = "fast"
+
+
+def wav_bytes(audio, framerate, nchannels):
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(nchannels)
+        wf.setsampwidth(2)
+        wf.setframerate(framerate)
+        wf.writeframes(np.ascontiguousarray(audio, dtype=np.int16))
+    return buf.getvalue()
 
-    intensity = compute_intensity(word_params)
 
-    # 1) Add beep
-    beep_freq = 440 + 660 * intensity
-    beep = make_beep(framerate, 0.18, beep_freq, nchannels)
-    audio = np.vstack((beep, audio)) if nchannels == 2 else np.concatenate((beep, audio))
+def render_preview(req, load=read_wav_memo, trace=NULL_TRACE):
+    baseline_path = req["baseline_path"]
+    if not os.path.exists(baseline_path):
+        raise FileNotFoundError(f"baseline_path not found: {baseline_path}")
+    word_params = request_word_params(req)
+    quality = resample.check_quality(req.get("resample_quality", PREVIEW_QUALITY))
+
+    # The first render of a process imports numpy (see lazy_import.py); its
+    # own stage keeps that out of read_wav
+    with trace.stage("import_numpy"):
+        finish_import(np)
+    with trace.stage("read_wav") as st:
+        audio, framerate, nchannels = load(baseline_path)
+        st.nbytes = audio.nbytes
+
+    n_words = word_count(word_params)
+    selected = sorted(int(i) for i in req.get("preview_words") or [])
+    if not selected or selected[0] < 0 or selected[-1] >= n_words:
+        raise ValueError(f"preview_words must be word indices in 0..{n_words - 1}")
+
+    with trace.stage("hash"):
+        key = file_sha256(baseline_path)
+    an, plan = frame_plan(baseline_path, audio, framerate, word_params, req.get("words"), key, trace)
+    bounds = cached_segment_map(key, audio, framerate, req.get("words"), n_words)
+
+    context = int(framerate * float(req.get("preview_context_s", PREVIEW_CONTEXT_S)))
+    lo = max(0, int(bounds[selected[0]]) - context)
+    hi = min(len(audio), int(bounds[selected[-1] + 1]) + context)
+
+    # Context words are rendered with their own params too
+    with trace.stage("synthesize") as st:
+        body = voice_dsp.render_span(an, plan, audio[lo:hi], lo, hi)
+        st.nbytes = body.nbytes
+
+    rate = framerate
+    preview_rate = int(req.get("preview_rate") or 0)
+    if 0 < preview_rate < framerate and len(body):
+        with trace.stage("downsample"):
+            body = np.clip(change_speed(body, framerate / preview_rate, quality), -32768, 32767)
+            rate = preview_rate
+
+    with trace.stage("encode_wav") as st:
+        data = wav_bytes(body, rate, nchannels)
+        st.nbytes = len(data)
+    return data
+
+
+def use_streaming(baseline_path):
+    with wave.open(baseline_path, "rb") as wf:
+        data_bytes = wf.getnframes() * wf.getnchannels() * wf.getsampwidth()
+        nchannels = wf.getnchannels()
+    return nchannels in (1, 2) and data_bytes > STREAM_THRESHOLD_MB * 1024 * 1024
+
+
+def render(baseline_path, output_path, word_params, load=read_wav, stream=None, options=None, trace=NULL_TRACE):
+    # stream=None picks the block-by-block path for large baselines only.
+    # Returns extra result fields for the caller (may be empty).
+    options = options or {}
+    words = options.get("words")
+    with trace.stage("import_numpy"):
+        finish_import(np)
+
+    if options.get("render_mode") == "per_word" and (word_params or getattr(word_params, "n_words", 0)):
+        trial_key = options.get("trial_key") or output_path
+        return _per_word_renderer.render(trial_key, baseline_path, output_path, word_params, words, trace=trace)
+
+    if stream is None:
+        stream = use_streaming(baseline_path)
+    if stream:
+        process_wav_streaming(baseline_path, output_path, word_params, trace=trace, words=words)
+    else:
+        process_wav(baseline_path, output_path, word_params, load, trace, words)
+    return {}
+
+
+def render_options(req):
+    # Request fields that change the rendered samples (part of the cache key).
+    # resample_quality is not one of them: only previews resample (they
+    # bypass the cache), so a full render's output does not depend on it.
+    options = {
+        "render_mode": req.get("render_mode", "global"),
+        # Word lengths place the word boundaries in every mode
+        "words": req.get("words"),
+    }
+    if request_format(req) >= 2:
+        # Sparse word_params leave the unedited words implicit
+        options["n_words"] = req["n_words"]
+        options["params"] = req["params"]
+    return options
+
+
+def get_render_cache():
+    if RENDER_CACHE_MAX_MB <= 0:
+        return None
+    return RenderCache(RENDER_CACHE_DIR, int(RENDER_CACHE_MAX_MB * 1024 * 1024))
+
+
+def partial_path(output_path):
+    # Outputs are written here first and renamed into place, so a reader
+    # never sees a half-written WAV
+    p = Path(output_path)
+    return str(p.with_name(f".{p.name}.{os.getpid()}.partial"))
+
+
+def run_request(req, load=read_wav, trace=None):
+    # Renders one request dict (same schema as the --request file).
+    # Returns {"output_path": ..., "cache": "hit" | "miss" | "off", ...}
+    # With "trace": true the per-stage breakdown is also written next to
+    # output_path (see render_trace.sidecar_path) and to the trace log.
+    if trace is None:
+        trace = Trace() if req.get("trace") else NULL_TRACE
 
-    # 2) Speed change
-    factor = 0.8 + 0.4 * intensity
-    audio = change_speed(audio, factor)
+    baseline_path = req["baseline_path"]
+    output_path = req["output_path"]
+    word_params = request_word_params(req)
+    # Ignored by full renders, but a bad value is still an error
+    resample.check_quality(req.get("resample_quality", resample.DEFAULT_QUALITY))
+    stream = req.get("stream")
+    options = render_options(req)
+    options["trial_key"] = req.get("trial_key") or output_path
 
-    # 3) Volume change
-    gain = 1.0 + 0.4 * intensity
-    audio = np.clip(audio * gain, -32768, 32767)
+    if not os.path.exists(baseline_path):
+        raise FileNotFoundError(f"baseline_path not found: {baseline_path}")
 
-    write_wav(output_path, audio, framerate, nchannels)
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    partial = partial_path(output_path)
+    try:
+        cache = get_render_cache()
+        if cache is None:
+            extra = render(baseline_path, partial, word_params, load, stream, options, trace)
+            result = {"output_path": output_path, "cache": "off", **extra}
+        else:
+            with trace.stage("cache_lookup"):
+                key = cache.key(baseline_path, word_params, GENERATOR_VERSION, render_options(req))
+                hit = cache.fetch(key, partial)
+            if hit:
+                result = {"output_path": output_path, "cache": "hit"}
+            else:
+                extra = render(baseline_path, partial, word_params, load, stream, options, trace)
+                with trace.stage("cache_store"):
+                    cache.store(key, partial)
+                result = {"output_path": output_path, "cache": "miss", **extra}
+        os.replace(partial, output_path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.unlink(partial)
+        raise
+
+    if trace.enabled:
+        record = {
+            "generator_version": GENERATOR_VERSION,
+            "audio_id": req.get("audio_id"),
+            "time": time.time(),
+            **result,
+            **trace.to_dict(),
+        }
+        write_sidecar(output_path, record)
+        log_path = req.get("trace_log") or GENERATE_TRACE_LOG
+        if log_path:
+            append_trace_log(log_path, record)
+    return result
+
+
+def run_batch_item(item):
+    # Runs in a pool worker; never raises so one bad request cannot stop the batch
+    line_no, req = item
+    start = time.perf_counter()
+    record = {"line": line_no, "audio_id": req.get("audio_id"), "output_path": req.get("output_path")}
+    try:
+        result = run_request(req, load=read_wav_memo)
+        record.update(status="ok", cache=result["cache"])
+    except Exception as e:
+        record.update(status="error", error=f"{type(e).__name__}: {e}")
+    record["elapsed_ms"] = round((time.perf_counter() - start) * 1000.0, 3)
+    return record
+
+
+def read_batch(path):
+    # ([(line_no, request)], [error records for lines that are not a JSON object])
+    items, errors = [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                req = json.loads(line)
+            except json.JSONDecodeError as e:
+                errors.append({"line": line_no, "status": "error", "error": f"JSONDecodeError: {e}"})
+                continue
+            if not isinstance(req, dict):
+                errors.append({"line": line_no, "status": "error",
+                               "error": f"ValueError: expected a JSON object, got {type(req).__name__}"})
+                continue
+            items.append((line_no, req))
+    return items, errors
+
+
+def run_batch(batch_path, log_path, jobs):
+    items, errors = read_batch(batch_path)
+
+    # Neighbouring items share a baseline, so a worker's decoded copy gets reused
+    items.sort(key=lambda item: str(item[1].get("baseline_path", "")))
+    chunksize = max(1, len(items) // (jobs * 8))
+
+    ok, failed = 0, len(errors)
+    start = time.perf_counter()
+    Path(log_path).parent.mkdir(parents=True, exist_ok=True)
+    finish_import(np)
+    with open(log_path, "w", encoding="utf-8") as log, multiprocessing.Pool(jobs) as pool:
+        # Unreadable lines are reported like failed jobs; the rest still run
+        for record in errors:
+            log.write(json.dumps(record) + "\n")
+        for record in pool.imap_unordered(run_batch_item, items, chunksize=chunksize):
+            log.write(json.dumps(record) + "\n")
+            log.flush()
+            if record["status"] == "ok":
+                ok += 1
+            else:
+                failed += 1
+    wall = time.perf_counter() - start
+
+    rate = len(items) / wall if wall > 0 else 0.0
+    print(f"Batch: {ok} ok, {failed} failed, {len(items) + len(errors)} total in {wall:.2f}s "
+          f"({rate:.1f} req/s, {jobs} worker(s)). Log: {log_path}")
+    return failed
 
 
 def main():
+    start = time.perf_counter()
     parser = argparse.ArgumentParser()
-    parser.add_argument("--request", required=True)
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--request", help="render a single request JSON file")
+    mode.add_argument("--batch", help="render every request in a JSONL file")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="worker processes for --batch (default: all cores)")
+    parser.add_argument("--log", help="JSONL results log for --batch (default: <batch>.results.jsonl)")
+    parser.add_argument("--trace", action="store_true",
+                        help="write per-stage timings next to the output (<output>.json)")
+    parser.add_argument("--trace-log", help="also append traced renders to this JSONL file")
     args = parser.parse_args()
 
-    with open(args.request, "r", encoding="utf-8") as f:
-        req = json.load(f)
+    if args.batch:
+        log_path = args.log or str(Path(args.batch).with_suffix(".results.jsonl"))
+        failed = run_batch(args.batch, log_path, max(1, args.jobs))
+        sys.exit(1 if failed else 0)
 
-    baseline_path = req["baseline_path"]
-    output_path = req["output_path"]
-    word_params = req.get("word_params", {})
-
-    if not os.path.exists(baseline_path):
-        raise FileNotFoundError(f"baseline_path not found: {baseline_path}")
-
-    process_wav(baseline_path, output_path, word_params)
-
-    print(f"Generated: {output_path}")
+    parse_start = time.perf_counter()
+    with open(args.request, "r", encoding="utf-8") as f:
+        text = f.read()
+    req = json.loads(text)
+    parse_s = time.perf_counter() - parse_start
+
+    if args.trace_log:
+        req["trace_log"] = args.trace_log
+    trace = NULL_TRACE
+    if args.trace or args.trace_log or req.get("trace"):
+        trace = Trace(started=start)
+        trace.add("parse_request", parse_s, len(text))
+
+    if req.get("op") == "preview":
+        data = render_preview(req, trace=trace)
+        Path(req["output_path"]).parent.mkdir(parents=True, exist_ok=True)
+        partial = partial_path(req["output_path"])
+        with open(partial, "wb") as f:
+            f.write(data)
+        os.replace(partial, req["output_path"])
+        print(f"Generated: {req['output_path']}")
+        print("Cache: off")
+        return
+
+    result = run_request(req, trace=trace)
+
+    print(f"Generated: {result['output_path']}")
+    print(f"Cache: {result['cache']}")
+    if "segments_total" in result:
+        print(f"Segments: {result['segments_rendered']}/{result['segments_total']}")
+    # Whole process, startup included: what this render cost the machine
+    print(f"CPU: {time.process_time() * 1000.0:.1f} ms")
 
 
 if __name__ == "__main__":
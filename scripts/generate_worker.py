@@ -0,0 +1,72 @@
+# scripts/generate_worker.py
+#
+# Long-lived generation worker.
+# Imports the generator once and then serves requests over stdin/stdout,
+# so a render does not pay interpreter startup and the numpy import.
+#
+# Protocol (one JSON object per line):
+#   -> {"ready": true}                                 once, after startup
+#   <- {<same schema as the --request file>}
+#   -> {"ok": true, "output_path": "...", "cache": "hit", "elapsed_ms": 12.3, "cpu_ms": 11.8}
+#   -> {"ok": false, "error": "...", "traceback": "...", "cpu_ms": 0.4}
+#
+# Requests with "op": "preview" are answered with the WAV inline instead of
+# writing output_path:
+#   -> {"ok": true, "wav_b64": "...", "elapsed_ms": 4.2}
+
+import base64
+import json
+import sys
+import time
+import traceback
+
+from generate_audio import render_preview, run_request
+from render_trace import Trace
+
+
+def handle(line):
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        req = json.loads(line)
+        trace = None
+        if req.get("trace"):
+            trace = Trace(started=start)
+            trace.add("parse_request", time.perf_counter() - start, len(line))
+        if req.get("op") == "preview":
+            data = render_preview(req)
+            result = {"wav_b64": base64.b64encode(data).decode("ascii")}
+        else:
+            result = run_request(req, trace=trace)
+    except Exception as e:
+        tb = traceback.format_exc()
+        sys.stderr.write(tb)
+        cpu_ms = (time.process_time() - cpu_start) * 1000.0
+        return {"ok": False, "error": f"{type(e).__name__}: {e}", "traceback": tb, "cpu_ms": round(cpu_ms, 3)}
+
+    elapsed_ms = (time.perf_counter() - start) * 1000.0
+    cpu_ms = (time.process_time() - cpu_start) * 1000.0
+    return {"ok": True, **result, "elapsed_ms": round(elapsed_ms, 3), "cpu_ms": round(cpu_ms, 3)}
+
+
+def send(out, msg):
+    out.write(json.dumps(msg) + "\n")
+    out.flush()
+
+
+def main():
+    # Keep stdout for responses only; anything the generator prints goes to stderr
+    out = sys.stdout
+    sys.stdout = sys.stderr
+
+    send(out, {"ready": True})
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        send(out, handle(line))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+# scripts/lazy_import.py
+#
+# Deferred imports for heavy dependencies.
+#
+# lazy("numpy") returns a module object at once; the real import runs the
+# first time one of its attributes is used. A generator run that never
+# touches samples (argument errors, --help, render-cache hits) therefore
+# never pays for numpy. Modules already imported are returned as they are.
+#
+# The first attribute access must not race between threads (the loader
+# is not thread-safe before Python 3.12): every caller here either imports
+# eagerly first (demo2.py) or is single-threaded (the generator).
+
+import importlib.util
+import sys
+
+
+def lazy(name):
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def finish_import(module):
+    # Finishes a lazy import now, e.g. before forking workers that would
+    # otherwise each import it again
+    getattr(module, "__name__")
+    return module
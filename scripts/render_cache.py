@@ -0,0 +1,110 @@
+# scripts/render_cache.py
+#
+# Content-addressed cache of rendered WAVs.
+#
+# Key = sha256(baseline content hash, canonical word_params, generator version,
+# render options).
+# Entries are plain files named <key>.wav; a hit bumps the file mtime, so
+# eviction can drop the least recently used entries once the directory
+# grows past max_bytes.
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+# (path, size, mtime_ns) -> sha256 hex; avoids rehashing unchanged baselines
+_file_hash_memo = {}
+
+
+def file_sha256(path):
+    st = os.stat(path)
+    memo_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    digest = _file_hash_memo.get(memo_key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        digest = h.hexdigest()
+        _file_hash_memo[memo_key] = digest
+    return digest
+
+
+def canonical_word_params(word_params):
+    # Same params in any key order / int-or-str indices / int-or-float values
+    # must produce the same key
+    canon = {}
+    for wi, pmap in (word_params or {}).items():
+        if not isinstance(pmap, dict):
+            continue
+        canon[str(int(wi))] = {p: float(v) for p, v in sorted(pmap.items())}
+    ordered = dict(sorted(canon.items(), key=lambda kv: int(kv[0])))
+    return json.dumps(ordered, separators=(",", ":"))
+
+
+class RenderCache:
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    def key(self, baseline_path, word_params, version, options=None):
+        # options: other request fields that change the rendered samples
+        h = hashlib.sha256()
+        h.update(file_sha256(baseline_path).encode())
+        h.update(b"\0")
+        h.update(canonical_word_params(word_params).encode())
+        h.update(b"\0")
+        h.update(str(version).encode())
+        if options:
+            h.update(b"\0")
+            h.update(json.dumps(options, sort_keys=True, separators=(",", ":")).encode())
+        return h.hexdigest()
+
+    def path_for(self, key):
+        return self.cache_dir / f"{key}.wav"
+
+    def fetch(self, key, output_path):
+        # Copies a cached render to output_path; returns False on a miss
+        entry = self.path_for(key)
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.utime(entry)
+            shutil.copyfile(entry, output_path)
+        except FileNotFoundError:
+            # Missing, or evicted by another process in the meantime
+            return False
+        return True
+
+    def store(self, key, rendered_path):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry = self.path_for(key)
+        tmp = entry.with_suffix(f".tmp{os.getpid()}")
+        shutil.copyfile(rendered_path, tmp)
+        os.replace(tmp, entry)
+        self.evict()
+
+    def evict(self):
+        # Drops least recently used entries until the cache fits in max_bytes
+        entries = []
+        total = 0
+        for p in self.cache_dir.glob("*.wav"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, p))
+            total += st.st_size
+
+        entries.sort()
+        freed = 0
+        for _, size, p in entries:
+            if total - freed <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+            except FileNotFoundError:
+                pass
+            freed += size
+        return freed
@@ -0,0 +1,195 @@
+# scripts/render_scheduler.py
+#
+# Process-wide scheduler for generator work (renders and previews), shared
+# by every session of the server.
+#
+# At most `slots` tasks run at once. `reserved` of those slots only take
+# priority-0 tasks (previews), so a wall of full renders never blocks
+# interactive feedback. Queued tasks are picked by:
+#   1. effective priority (0 preview, 1 small render, 2 full render); a
+#      task gains one level for every aging_s it has waited, so full
+#      renders are not starved
+#   2. the session served least recently, so one session's burst does not
+#      delay everyone else (round-robin between sessions)
+#   3. submission order
+# A task only becomes eligible once its ready() returns True (renders of
+# one trial run in order). Once its cancelled() returns True, a queued
+# task is dropped without running, and on_cancel() is called.
+#
+# Backpressure: submit() raises SchedulerBusy when the queue holds
+# max_queue tasks, or max_per_session for the submitting session.
+#
+# stats() reports queue depth, running tasks, rejected and cancelled
+# counts, and p50/p95 wait and service times over the last METRIC_WINDOW
+# tasks of each priority.
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+PREVIEW, SMALL, FULL = 0, 1, 2
+PRIORITY_NAMES = ["preview", "small", "full"]
+METRIC_WINDOW = 200
+# Fairness history is trimmed to the sessions with queued work past this
+MAX_SESSIONS = 4096
+
+
+class SchedulerBusy(RuntimeError):
+    pass
+
+
+class Cancelled(Exception):
+    pass
+
+
+class Task:
+    def __init__(self, session, priority, fn, ready=None, cancelled=None, on_cancel=None):
+        self.session = session
+        self.priority = priority
+        self.fn = fn
+        self.ready = ready
+        self.cancelled = cancelled
+        self.on_cancel = on_cancel
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+    def wait(self, timeout=None):
+        # fn's return value; re-raises what fn raised
+        if not self.done.wait(timeout):
+            raise TimeoutError("render scheduler did not run the task in time")
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class RenderScheduler:
+    def __init__(self, slots, reserved=1, max_queue=64, max_per_session=16, aging_s=10.0):
+        self.slots = slots
+        self.reserved = reserved
+        self.max_queue = max_queue
+        self.max_per_session = max_per_session
+        self.aging_s = aging_s
+        self.lock = threading.Lock()
+        self.queue = []
+        self.running = []
+        self.last_served = {}
+        # {session: time.monotonic() its last task started}
+        self.executor = ThreadPoolExecutor(max_workers=slots, thread_name_prefix="render")
+        self.counts = {"completed": 0, "rejected": 0, "cancelled": 0}
+        self.waits = [deque(maxlen=METRIC_WINDOW) for _ in PRIORITY_NAMES]
+        self.services = [deque(maxlen=METRIC_WINDOW) for _ in PRIORITY_NAMES]
+
+    def submit(self, session, priority, fn, ready=None, cancelled=None, on_cancel=None):
+        task = Task(session, priority, fn, ready, cancelled, on_cancel)
+        with self.lock:
+            self._drop_cancelled()
+            queued = sum(1 for t in self.queue if t.session == session)
+            if len(self.queue) >= self.max_queue or queued >= self.max_per_session:
+                self.counts["rejected"] += 1
+                raise SchedulerBusy(f"Server busy: {len(self.queue)} render(s) queued, try again shortly.")
+            self.queue.append(task)
+            if len(self.last_served) > MAX_SESSIONS:
+                active = {t.session for t in self.queue}
+                self.last_served = {s: t for s, t in self.last_served.items() if s in active}
+            self._dispatch()
+        return task
+
+    def run(self, session, priority, fn, timeout=None):
+        # Submits and waits; for work the page needs right away (previews)
+        return self.submit(session, priority, fn).wait(timeout)
+
+    def _drop_cancelled(self):
+        kept = []
+        for task in self.queue:
+            if task.cancelled is not None and task.cancelled():
+                self.counts["cancelled"] += 1
+                task.error = Cancelled()
+                if task.on_cancel is not None:
+                    task.on_cancel()
+                task.done.set()
+            else:
+                kept.append(task)
+        self.queue = kept
+
+    def _pick(self, now, previews_only):
+        best, best_key = None, None
+        for task in self.queue:
+            if previews_only and task.priority != PREVIEW:
+                continue
+            if task.ready is not None and not task.ready():
+                continue
+            level = task.priority - int((now - task.submitted_at) / self.aging_s)
+            key = (level, self.last_served.get(task.session, 0.0), task.submitted_at)
+            if best_key is None or key < best_key:
+                best, best_key = task, key
+        return best
+
+    def _dispatch(self):
+        # Starts queued tasks while slots are free; caller holds the lock
+        self._drop_cancelled()
+        now = time.monotonic()
+        while len(self.running) < self.slots:
+            task = self._pick(now, previews_only=len(self.running) >= self.slots - self.reserved)
+            if task is None:
+                return
+            self.queue.remove(task)
+            self.running.append(task)
+            self.last_served[task.session] = now
+            task.started_at = now
+            self.executor.submit(self._run, task)
+
+    def _run(self, task):
+        try:
+            task.result = task.fn()
+        except BaseException as e:
+            task.error = e
+        finally:
+            task.finished_at = time.monotonic()
+            with self.lock:
+                self.running.remove(task)
+                self.counts["completed"] += 1
+                self.waits[task.priority].append(task.started_at - task.submitted_at)
+                self.services[task.priority].append(task.finished_at - task.started_at)
+                # A finished render can make the next one of its trial ready
+                self._dispatch()
+            task.done.set()
+
+    def poke(self):
+        # Re-checks readiness and cancellation, e.g. after a job was superseded
+        with self.lock:
+            self._dispatch()
+
+    def stats(self):
+        with self.lock:
+            self._drop_cancelled()
+            depth = [sum(1 for t in self.queue if t.priority == p) for p in range(len(PRIORITY_NAMES))]
+            waits = [w for ws in self.waits for w in ws]
+            services = [s for ss in self.services for s in ss]
+            return {
+                "slots": self.slots,
+                "running": len(self.running),
+                "queued": len(self.queue),
+                "depth": dict(zip(PRIORITY_NAMES, depth)),
+                **self.counts,
+                "wait_p50_s": percentile(waits, 0.5),
+                "wait_p95_s": percentile(waits, 0.95),
+                "service_p50_s": percentile(services, 0.5),
+                "service_p95_s": percentile(services, 0.95),
+                "by_priority": {
+                    name: {"wait_p95_s": percentile(self.waits[p], 0.95),
+                           "service_p95_s": percentile(self.services[p], 0.95)}
+                    for p, name in enumerate(PRIORITY_NAMES)
+                },
+            }
@@ -0,0 +1,103 @@
+# scripts/render_trace.py
+#
+# Per-stage timings and byte counts for one render.
+#
+# Stages with the same name add up, so the streaming path's per-block reads
+# show as one "read_wav" stage. When tracing is off, NULL_TRACE hands out a
+# single shared no-op stage, so disabled instrumentation costs one call per
+# stage and allocates nothing.
+
+import json
+import os
+import time
+from pathlib import Path
+
+
+class _Stage:
+    __slots__ = ("trace", "name", "nbytes", "start")
+
+    def __init__(self, trace, name, nbytes):
+        self.trace = trace
+        self.name = name
+        self.nbytes = nbytes
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.trace.add(self.name, time.perf_counter() - self.start, self.nbytes)
+        return False
+
+
+class Trace:
+    enabled = True
+
+    def __init__(self, started=None):
+        self.started = time.perf_counter() if started is None else started
+        self.stages = {}
+        # {name: [seconds, bytes, calls]}, in first-seen order
+
+    def stage(self, name, nbytes=0):
+        # with trace.stage("read_wav") as s: ...; s.nbytes = len(frames)
+        return _Stage(self, name, nbytes)
+
+    def add(self, name, seconds, nbytes=0):
+        entry = self.stages.setdefault(name, [0.0, 0, 0])
+        entry[0] += seconds
+        entry[1] += nbytes or 0
+        entry[2] += 1
+
+    def to_dict(self):
+        return {
+            "total_ms": round((time.perf_counter() - self.started) * 1000.0, 3),
+            "stages": [
+                {"name": name, "ms": round(seconds * 1000.0, 3), "bytes": nbytes, "calls": calls}
+                for name, (seconds, nbytes, calls) in self.stages.items()
+            ],
+        }
+
+
+class _NullStage:
+    nbytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class NullTrace:
+    enabled = False
+    _stage = _NullStage()
+
+    def stage(self, name, nbytes=0):
+        return self._stage
+
+    def add(self, name, seconds, nbytes=0):
+        pass
+
+
+NULL_TRACE = NullTrace()
+
+
+def sidecar_path(output_path):
+    # generated/ex1_generated.wav -> generated/ex1_generated.json
+    return Path(output_path).with_suffix(".json")
+
+
+def write_sidecar(output_path, record):
+    # Written to a temp file and renamed, like the output itself
+    path = sidecar_path(output_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.partial")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=2)
+    os.replace(tmp, path)
+
+
+def append_trace_log(log_path, record):
+    Path(log_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
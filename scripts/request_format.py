@@ -0,0 +1,53 @@
+# scripts/request_format.py
+#
+# Generation request formats.
+#
+# Format 1 (no "format" field): "word_params" maps every word index to its
+# full {param: value} map.
+#
+# Format 2: only words that differ from the default are stored, as a value
+# vector in "params" order, and the file is written without indentation:
+#   {"format": 2, "n_words": 1500, "params": ["breathiness", ...],
+#    "word_edits": {"12": [0.5, 0, 0, 1, 0]}, ...}
+# Every other word has all params at 0.0.
+
+REQUEST_FORMAT = 2
+
+
+class WordEdits(dict):
+    # Format 2 word params: {"<index>": {param: value}} for edited words
+    # only, plus what is needed to account for the unedited ones
+    def __init__(self, edits, n_words, params):
+        super().__init__(edits)
+        self.n_words = n_words
+        self.params = list(params)
+
+    @property
+    def n_values(self):
+        # Value count of the equivalent dense word_params
+        return self.n_words * len(self.params)
+
+
+def request_format(req):
+    version = int(req.get("format", 1))
+    if version < 1 or version > REQUEST_FORMAT:
+        raise ValueError(f"Unsupported request format {version}; this generator reads 1..{REQUEST_FORMAT}")
+    return version
+
+
+def request_word_params(req):
+    # word_params for the renderer: the dense dict as-is for format 1,
+    # a WordEdits for format 2
+    if request_format(req) == 1:
+        return req.get("word_params", {})
+
+    params = req["params"]
+    n_words = int(req["n_words"])
+    edits = {}
+    for wi, values in req.get("word_edits", {}).items():
+        if len(values) != len(params):
+            raise ValueError(f"word_edits[{wi!r}] has {len(values)} values, expected {len(params)}")
+        if not 0 <= int(wi) < n_words:
+            raise ValueError(f"word_edits index {wi!r} out of range for {n_words} words")
+        edits[str(int(wi))] = dict(zip(params, values))
+    return WordEdits(edits, n_words, params)
@@ -0,0 +1,71 @@
+# scripts/session_stats.py
+#
+# Memory telemetry for the app's sessions.
+#
+# state_size() estimates the bytes one value of a session's state holds:
+# dicts, lists, tuples and sets are walked, as are the attributes of the
+# app's own state classes named in `expand` (by name: Streamlit redefines
+# the page's classes on every rerun); anything else counts
+# sys.getsizeof only (a render job references the shared generator worker,
+# it does not own it). Numpy arrays report their buffer through getsizeof.
+# Objects reachable twice are counted once.
+#
+# SessionStats is the process-wide registry sessions report into: per
+# session, the state size, key count and largest keys. Sessions that have
+# not reported for max_age_s are dropped. All sessions of a server process
+# share its memory, so the sum is what a per-process limit has to cover.
+
+import sys
+import threading
+import time
+
+TOP_KEYS = 5
+
+
+def state_size(obj, expand=(), seen=None):
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        elif type(o).__name__ in expand:
+            if hasattr(o, "__dict__"):
+                stack.append(vars(o))
+            stack.extend(getattr(o, name, None) for name in getattr(type(o), "__slots__", ()))
+    return total
+
+
+class SessionStats:
+    def __init__(self, max_age_s=1800.0):
+        self.max_age_s = max_age_s
+        self.sessions = {}
+        # {session_id: {"bytes", "keys", "top": [(key, bytes)], "updated"}}
+        self.lock = threading.Lock()
+
+    def record(self, session_id, state, expand=()):
+        # Measures one session's state ({key: value}) and stores the result
+        seen = set()
+        sizes = {str(k): state_size(v, expand, seen) for k, v in state.items()}
+        top = sorted(sizes.items(), key=lambda kv: kv[1], reverse=True)[:TOP_KEYS]
+        record = {"bytes": sum(sizes.values()), "keys": len(sizes), "top": top, "updated": time.time()}
+        with self.lock:
+            self.sessions[session_id] = record
+        return record
+
+    def snapshot(self, now=None):
+        # [(session_id, record)] of the sessions still reporting, biggest first
+        now = time.time() if now is None else now
+        with self.lock:
+            for sid in [s for s, r in self.sessions.items() if now - r["updated"] > self.max_age_s]:
+                del self.sessions[sid]
+            items = list(self.sessions.items())
+        return sorted(items, key=lambda item: item[1]["bytes"], reverse=True)
@@ -0,0 +1,328 @@
+# scripts/trial_store.py
+#
+# SQLite store for the trial catalog. It holds:
+#   - the built-in trials imported from data/trials.csv
+#   - the trials users add in a session
+#   - each session's per-word edits
+#
+# The CSV is only an import format. Every trial has a position (seq) in its
+# list, unique per session; session "" holds the built-in trials. A session
+# sees the built-in trials followed by its own, so the page can fetch one
+# trial, or a small window of trials, by position through the
+# (session, seq) index. It never has to hold the whole catalog.
+#
+# Transcript search uses an FTS5 index. "Next unedited" walks the position
+# index and probes the primary key of the edits table. Edits are stored per
+# trial in the request's word_edits format
+# ({"<word index>": [values in PARAMS order]}), and trials without edits
+# have no row.
+#
+# Usage (import or re-import the CSV, from the repo root):
+#   python scripts/trial_store.py --import data/trials.csv [--db data/trials.sqlite]
+
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+TRIAL_FIELDS = ["audio_id", "original", "baseline", "transcript"]
+BUILT_IN = ""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trials (
+    id INTEGER PRIMARY KEY,
+    session TEXT NOT NULL,
+    key TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    audio_id,
+    original TEXT NOT NULL,
+    baseline TEXT NOT NULL,
+    transcript TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS trials_key ON trials (session, key);
+CREATE UNIQUE INDEX IF NOT EXISTS trials_seq ON trials (session, seq);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS trials_fts USING fts5 (
+    transcript, content='trials', content_rowid='id', prefix='1 2 3'
+);
+CREATE TRIGGER IF NOT EXISTS trials_fts_insert AFTER INSERT ON trials BEGIN
+    INSERT INTO trials_fts (rowid, transcript) VALUES (new.id, new.transcript);
+END;
+CREATE TRIGGER IF NOT EXISTS trials_fts_delete AFTER DELETE ON trials BEGIN
+    INSERT INTO trials_fts (trials_fts, rowid, transcript) VALUES ('delete', old.id, old.transcript);
+END;
+CREATE TRIGGER IF NOT EXISTS trials_fts_update AFTER UPDATE OF transcript ON trials
+WHEN old.transcript IS NOT new.transcript BEGIN
+    INSERT INTO trials_fts (trials_fts, rowid, transcript) VALUES ('delete', old.id, old.transcript);
+    INSERT INTO trials_fts (rowid, transcript) VALUES (new.id, new.transcript);
+END;
+
+CREATE TABLE IF NOT EXISTS edits (
+    session TEXT NOT NULL,
+    trial_id INTEGER NOT NULL,
+    word_edits TEXT NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (session, trial_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+TRIAL_COLUMNS = "id, seq, audio_id, original, baseline, transcript"
+
+
+def read_trials_csv(path):
+    # Rows of a trials.csv as dicts of TRIAL_FIELDS; [] if the file is missing or empty
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+    except FileNotFoundError:
+        print(f"Warning: {path} not found. No built-in trials will be loaded.")
+        return []
+    if not rows:
+        print(f"Warning: {path} is empty. No built-in trials will be loaded.")
+    trials = []
+    for row in rows:
+        trial = {name: (row.get(name) or "").strip() for name in TRIAL_FIELDS}
+        # Numeric ids stay numbers, as in the requests written so far
+        if trial["audio_id"].isdigit():
+            trial["audio_id"] = int(trial["audio_id"])
+        trials.append(trial)
+    return trials
+
+
+def match_query(text):
+    # FTS5 query for free text: every word must match, the last one as a prefix
+    words = ['"' + w.replace('"', '""') + '"' for w in text.split()]
+    if words:
+        words[-1] += "*"
+    return " ".join(words)
+
+
+class TrialStore:
+    # One connection shared by the threads of the server process; every call
+    # holds the lock for a few index lookups at most.
+
+    def __init__(self, path):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(SCHEMA)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    # --- catalog ---
+
+    def meta(self, name, default=None):
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def _set_meta(self, name, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, json.dumps(value)))
+
+    def import_csv(self, path, signature=None, baseline_ok=os.path.exists):
+        # Replaces the built-in trials with the valid rows of a trials.csv
+        # (transcript present, baseline file exists). Trials keep their id,
+        # and so their edits, as long as their audio_id stays the same.
+        # Returns (imported, skipped).
+        rows = read_trials_csv(path)
+        now = time.time()
+        valid, skipped, keys = [], 0, set()
+        for n, t in enumerate(rows):
+            if not t["transcript"] or not t["baseline"] or not baseline_ok(t["baseline"]):
+                skipped += 1
+                continue
+            key = str(t["audio_id"])
+            if not key or key in keys:
+                key = f"row:{n}"
+            keys.add(key)
+            valid.append((BUILT_IN, key, len(valid), t["audio_id"], t["original"], t["baseline"], t["transcript"], now))
+
+        with self.lock, self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            # Park every built-in trial on a negative seq so the new order can be written row by row
+            self.conn.execute("UPDATE trials SET seq = -1 - id WHERE session = ?", (BUILT_IN,))
+            self.conn.executemany(
+                "INSERT INTO trials (session, key, seq, audio_id, original, baseline, transcript, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (session, key) DO UPDATE SET seq = excluded.seq, audio_id = excluded.audio_id, "
+                "original = excluded.original, baseline = excluded.baseline, transcript = excluded.transcript",
+                valid,
+            )
+            # Rows that are gone from the CSV take their edits with them
+            self.conn.execute(
+                "DELETE FROM edits WHERE trial_id IN (SELECT id FROM trials WHERE session = ? AND seq < 0)", (BUILT_IN,)
+            )
+            self.conn.execute("DELETE FROM trials WHERE session = ? AND seq < 0", (BUILT_IN,))
+            self._set_meta("csv_signature", signature)
+            self._set_meta("built_in_count", len(valid))
+            self._set_meta("skipped_count", skipped)
+            version = self.conn.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+            self._set_meta("version", (json.loads(version[0]) if version else 0) + 1)
+        return len(valid), skipped
+
+    def built_in_count(self):
+        return self.meta("built_in_count", 0)
+
+    def count(self, session):
+        # Built-in trials plus the session's own
+        with self.lock:
+            n = self.conn.execute("SELECT count(*) FROM trials WHERE session = ?", (session,)).fetchone()[0]
+        return self.built_in_count() + n
+
+    def _trial(self, row, base):
+        trial = {name: row[name] for name in TRIAL_FIELDS}
+        trial["id"] = row["id"]
+        return base + row["seq"], trial
+
+    def window(self, session, index, radius):
+        # {position: trial} for the positions within radius of index
+        base = self.built_in_count()
+        lo, hi = index - radius, index + radius
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT 0 AS part, {TRIAL_COLUMNS} FROM trials WHERE session = ? AND seq BETWEEN ? AND ? "
+                f"UNION ALL SELECT 1 AS part, {TRIAL_COLUMNS} FROM trials WHERE session = ? AND seq BETWEEN ? AND ?",
+                (BUILT_IN, lo, hi, session, lo - base, hi - base),
+            ).fetchall()
+        return dict(self._trial(row, base if row["part"] else 0) for row in rows)
+
+    def add_trial(self, session, trial):
+        # Appends a trial to the session's list; returns its position
+        with self.lock, self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            seq = self.conn.execute(
+                "SELECT coalesce(max(seq) + 1, 0) FROM trials WHERE session = ?", (session,)
+            ).fetchone()[0]
+            self.conn.execute(
+                "INSERT INTO trials (session, key, seq, audio_id, original, baseline, transcript, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (session, str(seq), seq, trial["audio_id"], trial["original"], trial["baseline"],
+                 trial["transcript"], time.time()),
+            )
+        return self.built_in_count() + seq
+
+    def session_trials(self, session):
+        # The session's own trials, in order
+        base = self.built_in_count()
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT {TRIAL_COLUMNS} FROM trials WHERE session = ? ORDER BY seq", (session,)
+            ).fetchall()
+        return [self._trial(row, base)[1] for row in rows]
+
+    def search(self, session, text, limit=20):
+        # [(position, trial)] whose transcript has every word of text, at most
+        # limit of them. Matches are read in id order and the scan stops at
+        # limit, so a common word costs no more than a rare one.
+        query = match_query(text)
+        if not query:
+            return []
+        base = self.built_in_count()
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT t.session != ? AS part, {', '.join('t.' + c for c in TRIAL_COLUMNS.split(', '))} "
+                "FROM trials_fts f JOIN trials t ON t.id = f.rowid "
+                "WHERE trials_fts MATCH ? AND t.session IN (?, ?) ORDER BY f.rowid LIMIT ?",
+                (BUILT_IN, query, BUILT_IN, session, limit),
+            ).fetchall()
+        return sorted(self._trial(row, base if row["part"] else 0) for row in rows)
+
+    def referenced_files(self):
+        # Paths of every baseline and original a stored trial points at
+        with self.lock:
+            rows = self.conn.execute("SELECT baseline, original FROM trials").fetchall()
+        return {path for row in rows for path in row if path}
+
+    # --- edits ---
+
+    def get_edits(self, session, trial_id):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT word_edits FROM edits WHERE session = ? AND trial_id = ?", (session, trial_id)
+            ).fetchone()
+        return {} if row is None else json.loads(row[0])
+
+    def set_edits(self, session, trial_id, word_edits):
+        # An empty word_edits removes the row, so the trial counts as unedited again
+        with self.lock, self.conn:
+            if word_edits:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO edits (session, trial_id, word_edits, updated) VALUES (?, ?, ?, ?)",
+                    (session, trial_id, json.dumps(word_edits, separators=(",", ":")), time.time()),
+                )
+            else:
+                self.conn.execute("DELETE FROM edits WHERE session = ? AND trial_id = ?", (session, trial_id))
+
+    def next_unedited(self, session, index):
+        # First position after index (wrapping around) whose trial the session
+        # has not edited, or None if every trial is edited
+        base = self.built_in_count()
+        sql = ("SELECT seq FROM trials t WHERE session = ? AND seq >= ? AND seq < ? AND NOT EXISTS "
+               "(SELECT 1 FROM edits e WHERE e.session = ? AND e.trial_id = t.id) ORDER BY seq LIMIT 1")
+        # (list session, first seq, end seq, position of seq 0), searched in this order
+        parts = [(BUILT_IN, index + 1, base, 0), (session, index + 1 - base, 1 << 62, base),
+                 (BUILT_IN, 0, min(index, base), 0), (session, 0, index - base, base)]
+        with self.lock:
+            for owner, lo, hi, offset in parts:
+                if lo >= hi:
+                    continue
+                row = self.conn.execute(sql, (owner, max(lo, 0), hi, session)).fetchone()
+                if row is not None:
+                    return offset + row[0]
+        return None
+
+    def prune_sessions(self, max_age_s, now=None):
+        # Drops the trials and edits of sessions with no activity in max_age_s;
+        # returns the number of sessions removed
+        cutoff = (time.time() if now is None else now) - max_age_s
+        with self.lock, self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            stale = [row[0] for row in self.conn.execute(
+                "SELECT session FROM (SELECT session, created AS t FROM trials WHERE session != ? "
+                "UNION ALL SELECT session, updated FROM edits) GROUP BY session HAVING max(t) < ?",
+                (BUILT_IN, cutoff),
+            )]
+            for session in stale:
+                self.conn.execute("DELETE FROM edits WHERE session = ?", (session,))
+                self.conn.execute("DELETE FROM trials WHERE session = ?", (session,))
+        return len(stale)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--import", dest="csv_path", required=True, help="trials.csv to import")
+    parser.add_argument("--db", default=os.environ.get("DEMO_TRIAL_DB", "data/trials.sqlite"))
+    args = parser.parse_args()
+
+    store = TrialStore(args.db)
+    try:
+        st_ = os.stat(args.csv_path)
+        signature = [st_.st_mtime_ns, st_.st_size]
+    except OSError:
+        signature = None
+    start = time.perf_counter()
+    imported, skipped = store.import_csv(args.csv_path, signature)
+    print(f"Imported {imported} trial(s) into {args.db} in {time.perf_counter() - start:.2f} s; "
+          f"skipped {skipped} without a transcript or baseline")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
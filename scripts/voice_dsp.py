@@ -0,0 +1,623 @@
+# scripts/voice_dsp.py
+#
+# Frame-based voice-quality engine.
+#
+# analyze() runs once per baseline, block by block, and stores under
+# ANALYSIS_DIR/<sha256 of the file>/:
+#   spec.npy   Hann-windowed STFT of every channel / n_fft, as float16 (real, imag)
+#              pairs (channels, frames, bins, 2); only when it fits ANALYSIS_SPEC_MAX_MB
+#   cep.npy    low-quefrency cepstrum of the mono mix, float32 (frames, lifter); its
+#              transform is the cepstrally smoothed log-magnitude envelope
+#   f0.npy     F0 per frame in Hz from the normalized autocorrelation of the mono mix (0 = unvoiced)
+#   meta.json  rates, sizes, the median voiced F0 and whether spec.npy exists
+# spec.npy takes 4x the size of the WAV, everything else about a quarter of
+# a mono WAV. Renders open the arrays with mmap_mode="r", so they only page
+# in the frames they touch; without spec.npy (long baselines, which would
+# not fit the cache) they recompute the STFT of those frames from the
+# baseline. Either way the STFT goes through the same float16 rounding, so
+# a render does not depend on whether its baseline's STFT was cached.
+#
+# render_span() applies every word's params to the frames centred in it and
+# overlap-adds the result:
+#   average_pitch  moves the harmonics by PITCH_SEMITONES per unit; the envelope (formants) stays put
+#   average_range  scales F0 excursions around the baseline median in log frequency (-2 flat, +2 doubled)
+#   breathiness    replaces part of the harmonics, mostly above BREATH_LO_HZ, with envelope-shaped noise
+#   creakiness     amplitude modulation at F0 / 2 (period doubling) plus per-frame shimmer, voiced frames only
+#   nasality       a nasal resonance near NASAL_POLE_HZ and an anti-resonance near NASAL_ZERO_HZ
+# Samples that no edited frame overlaps are copied from the baseline, so
+# unedited words come out bit-identical. An edited frame only depends on its
+# word's params and on the frames back to its phase anchor (the word start,
+# or the last PHASE_ANCHOR_S boundary after it), so any span re-rendered on
+# its own matches the same span of a full render.
+
+import json
+import math
+import os
+import shutil
+import wave
+from collections import OrderedDict
+from pathlib import Path
+
+from lazy_import import lazy
+from render_cache import file_sha256
+
+np = lazy("numpy")
+
+ANALYSIS_DIR = os.environ.get("ANALYSIS_DIR", "generated/analysis")
+ANALYSIS_MAX_MB = float(os.environ.get("ANALYSIS_MAX_MB", "512"))
+# Bump whenever analyze() output changes, so stale caches are recomputed
+ANALYSIS_VERSION = 3
+ANALYSIS_FILES = ("cep.npy", "f0.npy", "meta.json")
+# Largest spec.npy an entry may hold (128 MB: about 6 minutes of 44.1 kHz mono);
+# longer baselines keep one entry well within ANALYSIS_MAX_MB by leaving it out
+ANALYSIS_SPEC_MAX_MB = float(os.environ.get("ANALYSIS_SPEC_MAX_MB", "128"))
+ANALYSIS_BLOCK_FRAMES = 2048
+MEMO_SIZE = 8
+
+# Working memory of render_span, split into chunks of frames
+SPAN_BUFFER_MB = float(os.environ.get("SPAN_BUFFER_MB", "16"))
+SPAN_BYTES_PER_BIN = 128
+
+PARAMS = ["breathiness", "creakiness", "nasality", "average_pitch", "average_range"]
+
+FRAME_S = 0.04
+F0_MIN_HZ = 60.0
+F0_MAX_HZ = 500.0
+VOICING_THRESHOLD = 0.6
+OCTAVE_TOLERANCE = 0.9
+F0_MEDIAN_FRAMES = 5
+# Frames this far below the loudest 1% are never voiced
+VOICING_FLOOR_DB = -40.0
+LIFTER_S = 0.0015
+EPS = 1e-3
+
+# Effect strengths, per unit of the slider value
+PITCH_SEMITONES = 2.0
+RANGE_EXPONENT = 0.5
+MAX_PITCH_RATIO = 2.0
+BREATH_MIX = 0.4
+BREATH_FLOOR = 0.2
+BREATH_LO_HZ = 1000.0
+BREATH_HI_HZ = 4000.0
+CREAK_DEPTH = 0.45
+CREAK_SHIMMER = 0.15
+NASAL_POLE_HZ, NASAL_POLE_BW_HZ, NASAL_POLE_DB = 250.0, 100.0, 4.0
+NASAL_ZERO_HZ, NASAL_ZERO_BW_HZ, NASAL_ZERO_DB = 1000.0, 250.0, 6.0
+PHASE_ANCHOR_S = 0.5
+
+_memo = OrderedDict()
+
+
+def frame_layout(framerate):
+    # (n_fft, hop): the power of two covering FRAME_S, 75% overlap
+    n_fft = 1 << int(math.ceil(math.log2(max(16.0, FRAME_S * framerate))))
+    return n_fft, n_fft // 4
+
+
+def hann(n_fft):
+    return (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n_fft) / n_fft)).astype(np.float32)
+
+
+def princarg(phase, out=None):
+    # Wraps to [-pi, pi]; rint is much cheaper than a float modulo. out may be phase itself.
+    turns = phase / np.float32(2 * np.pi)
+    np.rint(turns, out=turns)
+    turns *= np.float32(2 * np.pi)
+    return np.subtract(phase, turns, out=out)
+
+
+def overlap_add(frames, hop):
+    # (..., m, n_fft) frames, hop apart -> (..., (m - 1) * hop + n_fft) samples
+    *lead, m, n_fft = frames.shape
+    r = n_fft // hop
+    parts = frames.reshape(*lead, m, r, hop)
+    out = np.zeros((*lead, m + r - 1, hop), dtype=frames.dtype)
+    for j in range(r):
+        out[..., j:j + m, :] += parts[..., j, :]
+    return out.reshape(*lead, (m + r - 1) * hop)
+
+
+def hash_uniform(frames, nbins, salt):
+    # Uniform [0, 1) noise per (frame, bin) that only depends on its position,
+    # so a frame gets the same noise in any span it is rendered in
+    h = (frames.astype(np.uint32)[:, None] * np.uint32(0x9E3779B1)
+         + np.arange(nbins, dtype=np.uint32)[None, :] * np.uint32(0x85EBCA77)
+         + np.uint32(salt))
+    h ^= h >> np.uint32(16)
+    h *= np.uint32(0x7FEB352D)
+    h ^= h >> np.uint32(15)
+    h *= np.uint32(0x846CA68B)
+    h ^= h >> np.uint32(16)
+    return h.astype(np.float32) * np.float32(2.0 ** -32)
+
+
+def read_span(wf, lo, hi, nsamples, nchannels):
+    # float32 samples [lo, hi) of an open WAV, zeros outside the signal
+    out = np.zeros((hi - lo, nchannels), dtype=np.float32)
+    a, b = max(lo, 0), min(hi, nsamples)
+    if a < b:
+        wf.setpos(a)
+        chunk = np.frombuffer(wf.readframes(b - a), dtype=np.int16).reshape(-1, nchannels)
+        out[a - lo:a - lo + len(chunk)] = chunk
+    return out
+
+
+def windowed_frames(wf, fa, fb, n_fft, hop, nsamples, nchannels, window):
+    # Hann-windowed frames [fa, fb) of an open WAV, (frames, channels, n_fft) float32
+    half = n_fft // 2
+    x = read_span(wf, fa * hop - half, (fb - 1) * hop + half, nsamples, nchannels)
+    return np.lib.stride_tricks.sliding_window_view(x, n_fft, axis=0)[::hop] * window
+
+
+def pack_spectra(X, n_fft):
+    # complex64 (..., bins) -> float16 (..., bins, 2); scaled by 1 / n_fft
+    # (exact, a power of two) so full-scale int16 input stays in range
+    X = np.ascontiguousarray(X / np.float32(n_fft))
+    return X.view(np.float32).reshape(*X.shape, 2).astype(np.float16)
+
+
+def unpack_spectra(packed, n_fft):
+    X = packed.astype(np.float32).view(np.complex64).reshape(packed.shape[:-1])
+    X *= np.float32(n_fft)
+    return X
+
+
+def cepstrum_envelope(cep, n_fft):
+    # (frames, lifter) low-quefrency cepstrum -> (frames, bins) log-magnitude envelope
+    lifter = cep.shape[-1]
+    full = np.zeros((len(cep), n_fft), dtype=np.float32)
+    full[:, :lifter] = cep
+    full[:, n_fft - lifter + 1:] = cep[:, :0:-1]
+    return np.fft.rfft(full, axis=-1).real
+
+
+def analyze(path, directory):
+    # Writes the analysis arrays of a 16-bit PCM WAV into a new directory
+    directory = Path(directory)
+    directory.mkdir(parents=True)
+    with wave.open(str(path), "rb") as wf:
+        nchannels = wf.getnchannels()
+        framerate = wf.getframerate()
+        nsamples = wf.getnframes()
+        if wf.getsampwidth() != 2:
+            raise RuntimeError("Only 16-bit PCM WAV supported in demo.")
+
+        n_fft, hop = frame_layout(framerate)
+        nframes = nsamples // hop + 1
+        window = hann(n_fft)
+
+        lag_min = max(2, int(framerate / F0_MAX_HZ))
+        lag_max = min(n_fft - 2, int(math.ceil(framerate / F0_MIN_HZ)))
+        # Autocorrelation of the window itself, divided out so long lags are not penalized
+        win_ac = np.fft.irfft(np.abs(np.fft.rfft(window, 2 * n_fft)) ** 2)[:lag_max + 2].astype(np.float32)
+        lifter = max(8, int(framerate * LIFTER_S))
+        nbins = n_fft // 2 + 1
+
+        spec = None
+        if nchannels * nframes * nbins * 4 <= ANALYSIS_SPEC_MAX_MB * 1024 * 1024:
+            spec = np.lib.format.open_memmap(directory / "spec.npy", "w+", np.float16, (nchannels, nframes, nbins, 2))
+        cep = np.lib.format.open_memmap(directory / "cep.npy", "w+", np.float32, (nframes, lifter))
+        lags = np.zeros(nframes, dtype=np.float32)
+        strength = np.zeros(nframes, dtype=np.float32)
+        energy = np.zeros(nframes, dtype=np.float64)
+
+        for fa in range(0, nframes, ANALYSIS_BLOCK_FRAMES):
+            fb = min(nframes, fa + ANALYSIS_BLOCK_FRAMES)
+            frames = windowed_frames(wf, fa, fb, n_fft, hop, nsamples, nchannels, window)
+            X = np.fft.rfft(frames, axis=-1)
+            if spec is not None:
+                spec[:, fa:fb] = pack_spectra(X, n_fft).transpose(1, 0, 2, 3)
+
+            # The cepstrum of a real spectrum is symmetric: its first lifter
+            # coefficients are all cepstrum_envelope() needs
+            mono = X.mean(axis=1)
+            cep[fa:fb] = np.fft.irfft(np.log(np.abs(mono) + EPS), n_fft, axis=-1)[:, :lifter]
+
+            ac = np.fft.irfft(np.abs(np.fft.rfft(frames.mean(axis=1), 2 * n_fft, axis=-1)) ** 2,
+                              axis=-1)[:, :lag_max + 2]
+            energy[fa:fb] = ac[:, 0]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                nac = (ac / win_ac) / (ac[:, :1] / win_ac[0])
+            nac = np.nan_to_num(nac, nan=0.0, posinf=0.0, neginf=0.0)
+            # The shortest lag with a local peak close to the best one; multiples
+            # of the period score almost as high and would halve F0
+            cand = nac[:, lag_min:lag_max + 1]
+            peaks = (cand >= nac[:, lag_min - 1:lag_max]) & (cand >= nac[:, lag_min + 1:lag_max + 2])
+            good = peaks & (cand >= OCTAVE_TOLERANCE * cand.max(axis=1, keepdims=True))
+            k = lag_min + np.where(good.any(axis=1), np.argmax(good, axis=1), np.argmax(cand, axis=1))
+            rows = np.arange(len(k))
+            a, b, c = nac[rows, k - 1], nac[rows, k], nac[rows, k + 1]
+            # Parabolic peak interpolation
+            denom = a - 2 * b + c
+            shift = np.where(np.abs(denom) > 1e-9, 0.5 * (a - c) / np.where(denom == 0, 1, denom), 0.0)
+            lags[fa:fb] = k + np.clip(shift, -0.5, 0.5)
+            strength[fa:fb] = b
+
+    loud = np.percentile(energy, 99) if nframes else 0.0
+    voiced = (strength > VOICING_THRESHOLD) & (energy > loud * 10 ** (VOICING_FLOOR_DB / 10)) & (energy > 0)
+    f0 = np.where(voiced, framerate / np.maximum(lags, 1.0), 0.0).astype(np.float32)
+    if nframes >= F0_MEDIAN_FRAMES:
+        # Running median against short octave jumps at voicing transitions
+        r = F0_MEDIAN_FRAMES // 2
+        padded = np.concatenate((np.repeat(f0[:1], r), f0, np.repeat(f0[-1:], r)))
+        med = np.median(np.lib.stride_tricks.sliding_window_view(padded, F0_MEDIAN_FRAMES), axis=1)
+        f0 = np.where(voiced & (med > 0), med, f0).astype(np.float32)
+    np.save(directory / "f0.npy", f0)
+    cep.flush()
+    if spec is not None:
+        spec.flush()
+    del cep, spec
+
+    meta = {
+        "version": ANALYSIS_VERSION,
+        "framerate": framerate,
+        "nchannels": nchannels,
+        "nsamples": nsamples,
+        "n_fft": n_fft,
+        "hop": hop,
+        "f0_ref": float(np.median(f0[f0 > 0])) if (f0 > 0).any() else 0.0,
+        "spec": (directory / "spec.npy").exists(),
+    }
+    with open(directory / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+
+class Analysis:
+    # source is a WAV with the analyzed content; get_analysis() points it at
+    # the path of the latest request, which has the same sha256
+    def __init__(self, directory, source):
+        directory = Path(directory)
+        with open(directory / "meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != ANALYSIS_VERSION:
+            raise ValueError(f"analysis version {meta.get('version')} != {ANALYSIS_VERSION}")
+
+        self.directory = directory
+        self.source = str(source)
+        self.framerate = meta["framerate"]
+        self.nchannels = meta["nchannels"]
+        self.nsamples = meta["nsamples"]
+        self.n_fft = meta["n_fft"]
+        self.hop = meta["hop"]
+        self.f0_ref = meta["f0_ref"]
+        self.spec = np.load(directory / "spec.npy", mmap_mode="r") if meta["spec"] else None
+        self.cep = np.load(directory / "cep.npy", mmap_mode="r")
+        self.f0 = np.load(directory / "f0.npy")
+        self.nframes = self.nsamples // self.hop + 1
+        self.nbins = self.n_fft // 2 + 1
+        if self.cep.ndim != 2 or len(self.cep) != self.nframes or not 0 < self.cep.shape[1] <= self.nbins \
+                or self.f0.shape != (self.nframes,) \
+                or self.spec is not None and self.spec.shape != (self.nchannels, self.nframes, self.nbins, 2):
+            raise ValueError(f"analysis arrays in {directory} do not match meta.json")
+
+        self.window = hann(self.n_fft)
+        self.anchor_frames = max(1, int(round(PHASE_ANCHOR_S * self.framerate / self.hop)))
+        freqs = np.arange(self.nbins) * self.framerate / self.n_fft
+        self.bin_advance = (2 * np.pi * self.hop / self.n_fft * np.arange(self.nbins)).astype(np.float32)
+        # Per-unit spectral shapes: nasal gain in natural-log units, breath mix by frequency
+        self.nasal_gain = (math.log(10) / 20 * (
+            NASAL_POLE_DB * np.exp(-((freqs - NASAL_POLE_HZ) / NASAL_POLE_BW_HZ) ** 2)
+            - NASAL_ZERO_DB * np.exp(-((freqs - NASAL_ZERO_HZ) / NASAL_ZERO_BW_HZ) ** 2))).astype(np.float32)
+        self.breath_ramp = (BREATH_FLOOR + (1 - BREATH_FLOOR)
+                            * np.clip((freqs - BREATH_LO_HZ) / (BREATH_HI_HZ - BREATH_LO_HZ), 0, 1)).astype(np.float32)
+        self._inverse_window_sums = {}
+
+    def spectra(self, fa, fb):
+        # STFT (channels, fb - fa, bins) of frames [fa, fb), from spec.npy or
+        # computed (and rounded) like analyze() does
+        if self.spec is not None:
+            return unpack_spectra(self.spec[:, fa:fb], self.n_fft)
+        with wave.open(self.source, "rb") as wf:
+            if (wf.getnchannels(), wf.getframerate(), wf.getnframes()) != (self.nchannels, self.framerate,
+                                                                           self.nsamples):
+                raise ValueError(f"{self.source} does not match its analysis in {self.directory}")
+            frames = windowed_frames(wf, fa, fb, self.n_fft, self.hop, self.nsamples, self.nchannels, self.window)
+        packed = pack_spectra(np.fft.rfft(frames, axis=-1), self.n_fft)
+        return unpack_spectra(packed.transpose(1, 0, 2, 3), self.n_fft)
+
+    def inverse_window_sum(self, nframes):
+        # 1 / overlap-add of the squared window over nframes consecutive frames;
+        # full chunks all share one size, so a few entries cover most calls
+        if nframes not in self._inverse_window_sums:
+            if len(self._inverse_window_sums) >= MEMO_SIZE:
+                self._inverse_window_sums.clear()
+            wsum = overlap_add(np.tile(self.window ** 2, (nframes, 1)), self.hop)
+            self._inverse_window_sums[nframes] = 1 / np.maximum(wsum, np.float32(1e-6))
+        return self._inverse_window_sums[nframes]
+
+
+def evict(analysis_dir, max_bytes, keep=None):
+    # Least recently used analyses go first; loading one bumps its files' mtime
+    entries = []
+    for d in Path(analysis_dir).iterdir():
+        if not d.is_dir() or d.name.endswith(".tmp") or d == keep:
+            continue
+        stats = [p.stat() for p in d.iterdir() if p.is_file()]
+        entries.append((max((s.st_mtime for s in stats), default=0.0), sum(s.st_size for s in stats), d))
+    total = sum(size for _, size, _ in entries)
+    if keep is not None and keep.exists():
+        total += sum(p.stat().st_size for p in keep.iterdir() if p.is_file())
+    for _, size, d in sorted(entries):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(d, ignore_errors=True)
+        total -= size
+
+
+def get_analysis(path, analysis_dir=None, key=None):
+    # Analysis of a WAV, from memory, its cached arrays, or computed and saved
+    analysis_dir = analysis_dir or ANALYSIS_DIR
+    key = key or file_sha256(path)
+    if key in _memo:
+        _memo.move_to_end(key)
+        _memo[key].source = str(path)
+        return _memo[key]
+
+    directory = Path(analysis_dir) / key
+    try:
+        for name in ANALYSIS_FILES:
+            os.utime(directory / name)
+        an = Analysis(directory, path)
+        if an.spec is not None:
+            os.utime(directory / "spec.npy")
+    except (OSError, ValueError, KeyError):
+        shutil.rmtree(directory, ignore_errors=True)
+        tmp = directory.with_name(f"{key}.{os.getpid()}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        try:
+            analyze(path, tmp)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        try:
+            os.replace(tmp, directory)
+        except OSError:
+            # Another process saved the same analysis first
+            shutil.rmtree(tmp, ignore_errors=True)
+        evict(analysis_dir, ANALYSIS_MAX_MB * 1024 * 1024, keep=directory)
+        an = Analysis(directory, path)
+
+    _memo[key] = an
+    while len(_memo) > MEMO_SIZE:
+        _memo.popitem(last=False)
+    return an
+
+
+class FramePlan:
+    # The params of one request, per analysis frame: every frame takes the
+    # values of the word its centre sample falls in
+    def __init__(self, an, bounds, values):
+        self.an = an
+        idx = np.arange(an.nframes)
+        values = np.asarray(values, dtype=np.float32).reshape(-1, len(PARAMS))
+        if len(values):
+            self.words = np.clip(np.searchsorted(bounds, idx * an.hop, side="right") - 1, 0, len(values) - 1)
+            self.values = values[self.words]
+        else:
+            self.words = np.zeros(an.nframes, dtype=np.int64)
+            self.values = np.zeros((an.nframes, len(PARAMS)), dtype=np.float32)
+        self.edited = (self.values != 0).any(axis=1)
+
+        # Phase anchor of every frame: its word's first frame or the last
+        # anchor_frames boundary after it, whichever is later
+        starts = np.concatenate(([True], self.words[1:] != self.words[:-1]))
+        word_start = np.maximum.accumulate(np.where(starts, idx, 0))
+        self.anchor = np.maximum(word_start, idx - idx % an.anchor_frames)
+
+    def word_spans(self, word_indices):
+        # Merged sample spans [lo, hi) that the frames of these words reach
+        an = self.an
+        half = an.n_fft // 2
+        spans = []
+        for w in sorted(int(w) for w in word_indices):
+            fs = int(np.searchsorted(self.words, w, side="left"))
+            fe = int(np.searchsorted(self.words, w, side="right"))
+            if fs >= fe:
+                continue
+            lo, hi = max(0, fs * an.hop - half), min(an.nsamples, (fe - 1) * an.hop + half)
+            if spans and lo <= spans[-1][1]:
+                spans[-1][1] = max(spans[-1][1], hi)
+            elif lo < hi:
+                spans.append([lo, hi])
+        return [tuple(s) for s in spans]
+
+
+def gather_bins(A, idx):
+    # A[..., f, idx[f, k]] for (..., frames, bins) A and (frames, bins) idx,
+    # as one flat take instead of take_along_axis' broadcast index arrays
+    m, nbins = A.shape[-2:]
+    flat = idx + (np.arange(m) * nbins)[:, None]
+    return np.take(A.reshape(*A.shape[:-2], m * nbins), flat, axis=-1)
+
+
+def shift_bins(Y, offset):
+    # Y(k - offset) per frame (offset in bins), linearly interpolated, zero outside the spectrum
+    nbins = Y.shape[-1]
+    pos = np.arange(nbins, dtype=np.float32) - offset[:, None]
+    i0 = np.floor(pos)
+    frac = pos - i0
+    i0 = i0.astype(np.intp)
+    w0 = 1 - frac
+    w0[(i0 < 0) | (i0 >= nbins)] = 0
+    frac[(i0 < -1) | (i0 >= nbins - 1)] = 0
+    out = gather_bins(Y, np.clip(i0, 0, nbins - 1))
+    out *= w0
+    upper = gather_bins(Y, np.clip(i0 + 1, 0, nbins - 1))
+    upper *= frac
+    out += upper
+    return out
+
+
+def synthesize_frames(an, plan, fa, fb):
+    # Spectra (channels, fb - fa, bins) of frames [fa, fb), each with its
+    # word's params applied. Everything stays float32 / complex64 and the
+    # per-bin work is done in place on a few (channels, frames, bins) buffers.
+    s = int(plan.anchor[fa])
+    slab = an.spectra(s, fb)
+    rel = np.flatnonzero(plan.edited[s:fb])
+    if len(rel) == 0:
+        return slab[:, fa - s:]
+
+    frames = s + rel
+    p = plan.values[frames]
+    X = slab[:, rel]
+    env = cepstrum_envelope(an.cep[frames], an.n_fft)
+    f0 = an.f0[frames]
+    voiced = f0 > 0
+    nbins = an.nbins
+    # The first frame of every anchor run keeps its analysis phase
+    anchors = plan.anchor[frames]
+    run_start = np.concatenate(([True], anchors[1:] != anchors[:-1]))
+    edges = np.flatnonzero(run_start).tolist() + [len(rel)]
+
+    mag = np.abs(X)
+    phase = np.angle(X)
+
+    ratio = 2.0 ** (p[:, 3] * (PITCH_SEMITONES / 12.0))
+    if an.f0_ref > 0:
+        ratio = ratio * np.where(voiced, (np.maximum(f0, 1.0) / an.f0_ref) ** (p[:, 4] * RANGE_EXPONENT), 1.0)
+    ratio = np.clip(ratio, 1.0 / MAX_PITCH_RATIO, MAX_PITCH_RATIO).astype(np.float32)
+    shifted = (p[:, 3] != 0) | (p[:, 4] != 0)
+    if shifted.any():
+        # Excitation (spectrum over envelope) is resampled along frequency,
+        # the envelope is not, so formants stay where they were
+        src = np.arange(nbins, dtype=np.float32) / ratio[:, None]
+        i0 = np.floor(src)
+        frac = src - i0
+        i0 = np.minimum(i0.astype(np.intp), nbins - 1)
+        resid = mag + np.float32(EPS)
+        np.log(resid, out=resid)
+        resid -= env
+        new_mag = gather_bins(resid, i0)
+        upper = gather_bins(resid, np.minimum(i0 + 1, nbins - 1))
+        upper -= new_mag
+        upper *= frac
+        new_mag += upper
+        new_mag += env
+        np.exp(new_mag, out=new_mag)
+        new_mag -= np.float32(EPS)
+        np.maximum(new_mag, 0, out=new_mag)
+        new_mag[:, src > nbins - 1] = 0
+
+        # Phase vocoder: every output bin advances like its source bin, times the ratio
+        src_bin = np.minimum(np.rint(src).astype(np.intp), nbins - 1)
+        omega = np.angle(slab[:, np.maximum(rel - 1, 0)])
+        np.subtract(phase, omega, out=omega)
+        omega -= an.bin_advance
+        princarg(omega, out=omega)
+        omega += an.bin_advance
+        omega = gather_bins(omega, src_bin)
+        omega *= ratio[:, None]
+        princarg(omega, out=omega)
+        new_phase = gather_bins(phase, src_bin)
+        for a, b in zip(edges[:-1], edges[1:]):
+            if b - a > 1:
+                run = omega[:, a + 1:b]
+                np.cumsum(run, axis=1, out=run)
+                run += new_phase[:, a:a + 1]
+                new_phase[:, a + 1:b] = run
+
+        if shifted.all():
+            mag, phase = new_mag, new_phase
+        else:
+            mag[:, shifted] = new_mag[:, shifted]
+            phase[:, shifted] = new_phase[:, shifted]
+
+    nasal = np.clip(p[:, 2], 0, None)
+    if nasal.any():
+        gain = nasal[:, None] * an.nasal_gain
+        mag *= np.exp(gain, out=gain)
+
+    breath = np.clip(p[:, 0] * BREATH_MIX, 0, 1)
+    if breath.any():
+        mix = breath[:, None] * an.breath_ramp
+        mag *= 1 - mix
+
+    # Polar to complex through cos / sin into one complex64 buffer
+    Y = np.empty(mag.shape, dtype=np.complex64)
+    np.cos(phase, out=Y.real)
+    Y.real *= mag
+    np.sin(phase, out=phase)
+    phase *= mag
+    Y.imag = phase
+
+    if breath.any():
+        noise_amp = np.exp(env)
+        noise_amp *= mix
+        noise_phase = hash_uniform(frames, nbins, 1)
+        noise_phase *= np.float32(2 * np.pi)
+        Y.real += noise_amp * np.cos(noise_phase)
+        np.sin(noise_phase, out=noise_phase)
+        noise_phase *= noise_amp
+        Y.imag += noise_phase
+
+    creak = np.clip(p[:, 1], 0, None) * voiced
+    if creak.any():
+        c = np.flatnonzero(creak > 0)
+        f0_out = f0 * ratio
+        # Modulator at F0 / 2, its phase continuous within each anchor run
+        step = np.pi * f0_out * an.hop / an.framerate
+        theta = np.zeros_like(step)
+        for a, b in zip(edges[:-1], edges[1:]):
+            if b - a > 1:
+                theta[a + 1:b] = np.cumsum(step[a + 1:b])
+        rot = np.exp(1j * theta[c]).astype(np.complex64)[:, None]
+        half_f0 = (0.5 * f0_out[c] * an.n_fft / an.framerate).astype(np.float32)
+        Yc = Y[:, c]
+        side = shift_bins(Yc, half_f0)
+        side *= rot
+        below = shift_bins(Yc, -half_f0)
+        below *= rot.conj()
+        side += below
+        side *= (0.5 * np.minimum(creak[c] * CREAK_DEPTH, 1.0))[:, None]
+        side += Yc
+        side *= (1 + CREAK_SHIMMER * creak[c] * (2 * hash_uniform(frames[c], 1, 2)[:, 0] - 1))[:, None]
+        Y[:, c] = side
+
+    slab[:, rel] = Y
+    return slab[:, fa - s:]
+
+
+def span_chunk_frames(an, buffer_bytes):
+    return max(16, int(buffer_bytes // (an.nchannels * an.nbins * SPAN_BYTES_PER_BIN)))
+
+
+def render_span(an, plan, base, lo, hi, chunk_frames=None, out=None):
+    # Renders samples [lo, hi) into out (int16, same shape as base; allocated
+    # when None) and returns it. base holds the baseline samples of the span.
+    if out is None:
+        out = np.empty(base.shape, dtype=np.int16)
+    np.copyto(out, base)
+    view = out.reshape(len(out), -1)
+    if chunk_frames is None:
+        chunk_frames = span_chunk_frames(an, SPAN_BUFFER_MB * 1024 * 1024)
+    hop, n_fft = an.hop, an.n_fft
+    half = n_fft // 2
+
+    for u in range(lo, hi, chunk_frames * hop):
+        v = min(hi, u + chunk_frames * hop)
+        # Every frame overlapping [u, v)
+        fa = max(0, (u - half) // hop + 1)
+        fb = min(an.nframes, -((-(v + half)) // hop))
+        if fa >= fb or not plan.edited[fa:fb].any():
+            continue
+
+        y = np.fft.irfft(synthesize_frames(an, plan, fa, fb), n_fft, axis=-1)
+        y *= an.window
+        acc = overlap_add(y, hop)
+
+        # Only samples under an edited frame take the overlap-add
+        cover = np.zeros(acc.shape[-1] + 1, dtype=np.int32)
+        edited = np.flatnonzero(plan.edited[fa:fb])
+        np.add.at(cover, edited * hop, 1)
+        np.add.at(cover, edited * hop + n_fft, -1)
+        start = fa * hop - half
+        mask = np.cumsum(cover[:-1])[u - start:v - start] > 0
+
+        vals = acc[:, u - start:v - start]
+        vals *= an.inverse_window_sum(fb - fa)[u - start:v - start]
+        np.rint(vals, out=vals)
+        np.clip(vals, -32768, 32767, out=vals)
+        for ch in range(view.shape[1]):
+            view[u - lo:v - lo, ch][mask] = vals[ch, mask]
+    return out
@@ -0,0 +1,158 @@
+# scripts/waveform_peaks.py
+#
+# Multi-resolution waveform peaks for drawing.
+#
+# Level 0 holds the min/max sample of every BASE_BUCKET frames (all
+# channels), each further level merges LEVEL_FACTOR buckets, up to at most
+# TOP_BUCKETS buckets. The 10 ms frame energies used by word_segments are
+# stored too, so word boundaries can be found without the samples.
+#
+# Peaks are computed once per WAV, block by block, and saved as
+# <sha256 of the file>.npz under PEAKS_DIR. Drawing any window only reads
+# the level whose bucket count fits the requested number of points.
+
+import math
+import os
+import wave
+from collections import OrderedDict
+from pathlib import Path
+
+from lazy_import import lazy
+from render_cache import file_sha256
+from word_segments import FRAME_S
+
+np = lazy("numpy")
+
+PEAKS_DIR = os.environ.get("PEAKS_DIR", "generated/peaks")
+PEAKS_MAX_FILES = 256
+BASE_BUCKET = 256
+LEVEL_FACTOR = 4
+TOP_BUCKETS = 512
+BLOCK_FRAMES = 1 << 20
+MEMO_SIZE = 16
+
+_memo = OrderedDict()
+
+
+def reduce_level(mins, maxs, factor):
+    # Merges every `factor` buckets; the last one may be partial
+    n = int(math.ceil(len(mins) / factor))
+    pad = n * factor - len(mins)
+    if pad:
+        mins = np.concatenate((mins, np.full(pad, mins[-1], dtype=mins.dtype)))
+        maxs = np.concatenate((maxs, np.full(pad, maxs[-1], dtype=maxs.dtype)))
+    return mins.reshape(n, factor).min(axis=1), maxs.reshape(n, factor).max(axis=1)
+
+
+def compute_peaks(path):
+    with wave.open(str(path), "rb") as wf:
+        nchannels = wf.getnchannels()
+        framerate = wf.getframerate()
+        nframes = wf.getnframes()
+        if wf.getsampwidth() != 2:
+            raise RuntimeError("Only 16-bit PCM WAV supported in demo.")
+
+        frame_len = max(1, int(framerate * FRAME_S))
+        # Blocks are whole buckets and whole energy frames, so blocking does not change the result
+        step = BASE_BUCKET * frame_len // math.gcd(BASE_BUCKET, frame_len)
+        block = max(step, BLOCK_FRAMES // step * step)
+
+        mins, maxs, energy = [], [], []
+        while True:
+            audio = np.frombuffer(wf.readframes(block), dtype=np.int16)
+            if len(audio) == 0:
+                break
+            audio = audio.reshape(-1, nchannels)
+            n = len(audio)
+
+            edges = np.arange(0, n, BASE_BUCKET)
+            mins.append(np.minimum.reduceat(audio.min(axis=1), edges))
+            maxs.append(np.maximum.reduceat(audio.max(axis=1), edges))
+
+            # Same values as word_segments.frame_energy on the whole file
+            mono = audio.astype(np.float32)
+            mono = mono.mean(axis=1) if nchannels == 2 else mono[:, 0]
+            nfull = n // frame_len
+            frames = mono[:nfull * frame_len].reshape(nfull, frame_len)
+            energy.append(np.einsum("ij,ij->i", frames, frames))
+
+    levels = [(np.concatenate(mins or [np.zeros(0, np.int16)]), np.concatenate(maxs or [np.zeros(0, np.int16)]))]
+    while len(levels[-1][0]) > TOP_BUCKETS:
+        levels.append(reduce_level(*levels[-1], LEVEL_FACTOR))
+
+    return {
+        "framerate": framerate,
+        "nframes": nframes,
+        "nchannels": nchannels,
+        "levels": levels,
+        "energy": np.concatenate(energy or [np.zeros(0, np.float32)]),
+    }
+
+
+def save_peaks(sidecar, peaks):
+    arrays = {"energy": peaks["energy"],
+              "info": np.array([peaks["framerate"], peaks["nframes"], peaks["nchannels"]], dtype=np.int64)}
+    for i, (mins, maxs) in enumerate(peaks["levels"]):
+        arrays[f"min{i}"] = mins
+        arrays[f"max{i}"] = maxs
+    tmp = sidecar.with_name(f"{sidecar.stem}.{os.getpid()}.tmp.npz")
+    np.savez(tmp, **arrays)
+    os.replace(tmp, sidecar)
+
+
+def load_peaks(sidecar):
+    with np.load(sidecar) as data:
+        framerate, nframes, nchannels = (int(v) for v in data["info"])
+        levels = []
+        while f"min{len(levels)}" in data:
+            levels.append((data[f"min{len(levels)}"], data[f"max{len(levels)}"]))
+        energy = data["energy"]
+    return {"framerate": framerate, "nframes": nframes, "nchannels": nchannels, "levels": levels, "energy": energy}
+
+
+def evict(peaks_dir, max_files):
+    # Oldest-used sidecars go first; loading one bumps its mtime
+    files = sorted(Path(peaks_dir).glob("*.npz"), key=lambda p: p.stat().st_mtime)
+    for p in files[:max(0, len(files) - max_files)]:
+        try:
+            p.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def get_peaks(path, peaks_dir=None):
+    # Peaks for a WAV, from memory, its sidecar, or computed and saved
+    peaks_dir = peaks_dir or PEAKS_DIR
+    key = file_sha256(path)
+    if key in _memo:
+        _memo.move_to_end(key)
+        return _memo[key]
+
+    sidecar = Path(peaks_dir) / f"{key}.npz"
+    try:
+        os.utime(sidecar)
+        peaks = load_peaks(sidecar)
+    except (FileNotFoundError, ValueError, KeyError, OSError):
+        peaks = compute_peaks(path)
+        sidecar.parent.mkdir(parents=True, exist_ok=True)
+        save_peaks(sidecar, peaks)
+        evict(peaks_dir, PEAKS_MAX_FILES)
+
+    _memo[key] = peaks
+    while len(_memo) > MEMO_SIZE:
+        _memo.popitem(last=False)
+    return peaks
+
+
+def peak_window(peaks, start_frame, end_frame, max_points):
+    # (bucket start times in seconds, mins, maxs) covering [start_frame,
+    # end_frame) from the finest level with at most max_points buckets there
+    span = max(1, end_frame - start_frame)
+    for level, (mins, maxs) in enumerate(peaks["levels"]):
+        bucket = BASE_BUCKET * LEVEL_FACTOR ** level
+        if span / bucket <= max_points or level == len(peaks["levels"]) - 1:
+            break
+    lo = max(0, start_frame // bucket)
+    hi = min(len(mins), int(math.ceil(end_frame / bucket)))
+    times = np.arange(lo, hi) * bucket / peaks["framerate"]
+    return times, mins[lo:hi], maxs[lo:hi]
@@ -0,0 +1,79 @@
+# scripts/word_segments.py
+#
+# Approximate word -> sample range map for a baseline.
+#
+# The demo has no forced aligner, so the audio is split in proportion to
+# word lengths and every boundary is then moved to the quietest 10 ms frame
+# within SNAP_WINDOW_S of it. Maps are memoized per (baseline key, words).
+
+from collections import OrderedDict
+
+from lazy_import import lazy
+
+np = lazy("numpy")
+
+FRAME_S = 0.01
+SNAP_WINDOW_S = 0.06
+MEMO_SIZE = 64
+
+_memo = OrderedDict()
+
+
+def word_weights(words, n_words):
+    # Longer words get proportionally more audio; unknown words weigh the same
+    if words and len(words) == n_words:
+        return np.array([len(str(w)) + 1 for w in words], dtype=np.float64)
+    return np.ones(n_words, dtype=np.float64)
+
+
+def frame_energy(audio, frame_len):
+    mono = audio.astype(np.float32)
+    if mono.ndim == 2:
+        mono = mono.mean(axis=1)
+    nfull = len(mono) // frame_len
+    frames = mono[:nfull * frame_len].reshape(nfull, frame_len)
+    return np.einsum("ij,ij->i", frames, frames)
+
+
+def segment_map(audio, framerate, weights):
+    # Returns n_words + 1 increasing frame boundaries; word i spans
+    # [bounds[i], bounds[i + 1])
+    frame_len = max(1, int(framerate * FRAME_S))
+    return segment_map_from_energy(frame_energy(audio, frame_len), len(audio), framerate, weights)
+
+
+def segment_map_from_energy(energy, n, framerate, weights):
+    # Same as segment_map, given frame_energy of an n-frame signal (lets
+    # waveform_peaks place words without the samples)
+    cum = np.concatenate(([0.0], np.cumsum(weights)))
+    bounds = np.round(cum / cum[-1] * n).astype(np.int64)
+
+    frame_len = max(1, int(framerate * FRAME_S))
+    if len(energy) == 0:
+        return bounds
+
+    reach = max(1, int(SNAP_WINDOW_S / FRAME_S))
+    for i in range(1, len(bounds) - 1):
+        centre = bounds[i] // frame_len
+        lo = max(0, centre - reach)
+        hi = min(len(energy), centre + reach + 1)
+        if lo >= hi:
+            continue
+        snapped = (lo + int(np.argmin(energy[lo:hi]))) * frame_len
+        # Never cross a neighbouring boundary
+        bounds[i] = min(max(snapped, bounds[i - 1]), n)
+
+    return np.maximum.accumulate(bounds)
+
+
+def cached_segment_map(baseline_key, audio, framerate, words, n_words):
+    key = (baseline_key, n_words, tuple(words) if words else None)
+    if key in _memo:
+        _memo.move_to_end(key)
+        return _memo[key]
+
+    bounds = segment_map(audio, framerate, word_weights(words, n_words))
+    _memo[key] = bounds
+    while len(_memo) > MEMO_SIZE:
+        _memo.popitem(last=False)
+    return bounds